@@ -0,0 +1,32 @@
+from drf_yasg import openapi
+
+from .serializers import BatchSerializer
+
+# swagger_auto_schema overrides for the batch view, attached lazily via scheduler_app.docs.document
+
+BATCH = {
+    "operation_description": (
+        "Execute several api_v1 requests in one round trip. Paths are relative to /api_v1/. "
+        "With `atomic`, all requests share one transaction that is rolled back at the first failure. "
+        "A sub-request whose response body is too large to buffer is reported with status 413."
+    ),
+    "request_body": BatchSerializer,
+    "responses": {
+        200: openapi.Response(
+            description="Status and body of each sub-request, in order",
+            examples={
+                "application/json": {
+                    "rolled_back": False,
+                    "responses": [
+                        {"status": 200, "body": [{"id": 1, "schedule": {}, "user": "username"}]},
+                        {"status": 404, "body": {"detail": "No Schedule matches the given query."}},
+                    ],
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Invalid batch",
+            examples={"application/json": {"requests": ["At least one request is required."]}},
+        ),
+    },
+}
@@ -0,0 +1,31 @@
+from django.conf import settings
+from rest_framework import serializers
+
+BATCH_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=BATCH_METHODS)
+    path = serializers.CharField(help_text="Path relative to /api_v1/, e.g. 'scheduler/schedules/1/'.")
+    body = serializers.JSONField(required=False, default=None)
+
+    def validate_method(self, value):
+        return value.upper()
+
+    def validate_path(self, value):
+        return value.lstrip("/")
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True)
+    atomic = serializers.BooleanField(
+        default=False,
+        help_text="Run all sub-requests in one transaction, rolled back and stopped at the first failure.",
+    )
+
+    def validate_requests(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one request is required.")
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f"At most {settings.BATCH_MAX_REQUESTS} requests per batch.")
+        return value
@@ -0,0 +1,138 @@
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from scheduler.models import Schedule
+from scheduler.tests import create_test_user, get_tokens_for_user
+
+
+class BatchAPITestCase(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+        self.schedule = Schedule.objects.create(
+            user=self.user, schedule={"monday": [{"start": "08:00", "stop": "10:00", "ids": [1]}]}
+        )
+        self.new_schedule = {"schedule": {"friday": [{"start": "09:00", "stop": "11:00", "ids": [2]}]}}
+
+    def batch(self, requests, atomic=False):
+        return self.client.post(reverse("batch"), {"requests": requests, "atomic": atomic}, format="json")
+
+    def test_batch_runs_sub_requests_in_order(self):
+        response = self.batch(
+            [
+                {"method": "GET", "path": "scheduler/schedules/"},
+                {"method": "POST", "path": "scheduler/schedules/", "body": self.new_schedule},
+                {"method": "GET", "path": f"scheduler/schedules/{self.schedule.id}/"},
+                {"method": "DELETE", "path": f"scheduler/schedules/{self.schedule.id}/"},
+                {"method": "GET", "path": "scheduler/schedules/occurrences/?from=2024-01-01&to=2024-01-07"},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["responses"]
+        self.assertEqual([result["status"] for result in results], [200, 201, 200, 204, 200])
+        self.assertEqual(len(results[0]["body"]), 1)
+        self.assertEqual(results[1]["body"]["user"], "testuser")
+        self.assertEqual(results[4]["body"][0]["day"], "friday")
+        self.assertEqual(list(Schedule.objects.values_list("schedule", flat=True)), [self.new_schedule["schedule"]])
+
+    def test_sub_requests_are_scoped_to_the_user(self):
+        other = Schedule.objects.create(user=create_test_user("otheruser"), schedule={})
+        response = self.batch([{"method": "GET", "path": f"scheduler/schedules/{other.id}/"}])
+        self.assertEqual(response.data["responses"][0]["status"], status.HTTP_404_NOT_FOUND)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        response = self.batch(
+            [
+                {"method": "POST", "path": "scheduler/schedules/", "body": self.new_schedule},
+                {"method": "POST", "path": "scheduler/schedules/", "body": {"schedule": {"funday": []}}},
+                {"method": "GET", "path": "scheduler/schedules/"},
+            ],
+            atomic=True,
+        )
+        self.assertTrue(response.data["rolled_back"])
+        self.assertEqual([result["status"] for result in response.data["responses"]], [201, 400, None])
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_unknown_and_nested_paths(self):
+        response = self.batch([{"method": "GET", "path": "nowhere/"}, {"method": "POST", "path": "batch/"}])
+        self.assertEqual([result["status"] for result in response.data["responses"]], [404, 400])
+
+    def test_batch_requires_authentication(self):
+        self.client.credentials()
+        response = self.batch([{"method": "GET", "path": "scheduler/schedules/"}])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_batch_size_is_limited(self):
+        with self.settings(BATCH_MAX_REQUESTS=2):
+            response = self.batch([{"method": "GET", "path": "scheduler/schedules/"}] * 3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_large_sub_responses_are_not_buffered(self):
+        path = f"scheduler/schedules/{self.schedule.id}/occurrences/?from=2024-01-01&to=2024-12-31"
+        with self.settings(BATCH_MAX_RESPONSE_BYTES=1024):
+            response = self.batch([{"method": "GET", "path": path}, {"method": "GET", "path": "scheduler/schedules/"}])
+        results = response.data["responses"]
+        self.assertEqual([result["status"] for result in results], [413, 200])
+        self.assertEqual(len(results[1]["body"]), 1)
+
+        response = self.batch([{"method": "GET", "path": path}])
+        self.assertEqual(len(response.data["responses"][0]["body"]), 53)
+
+
+class FileDatabaseBatchTestCase(TransactionTestCase):
+    """Atomic batches against a file-backed database.
+
+    Unlike the in-memory SQLite test database, whose connection ignores close(), a file
+    database's connection really closes, as production ones do.
+    """
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.use_file_copy_of_database()
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+
+    def use_file_copy_of_database(self):
+        directory = tempfile.TemporaryDirectory()
+        path = Path(directory.name) / "db.sqlite3"
+        connection.ensure_connection()
+        with closing(sqlite3.connect(path)) as target:
+            connection.connection.backup(target)
+        memory_connection, name = connection.connection, connection.settings_dict["NAME"]
+        connection.connection = None
+        connection.settings_dict["NAME"] = str(path)
+
+        def restore():
+            connection.close()
+            connection.settings_dict["NAME"] = name
+            connection.connection = memory_connection
+            directory.cleanup()
+
+        self.addCleanup(restore)
+
+    def test_atomic_batch_of_writes(self):
+        schedule = {"schedule": {"monday": [{"start": "08:00", "stop": "10:00", "ids": [1]}]}}
+        response = self.client.post(
+            reverse("batch"),
+            {
+                "requests": [
+                    {"method": "POST", "path": "scheduler/schedules/", "body": schedule},
+                    {"method": "POST", "path": "scheduler/schedules/", "body": schedule},
+                    {"method": "GET", "path": "scheduler/schedules/"},
+                ],
+                "atomic": True,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["status"] for result in response.data["responses"]], [201, 201, 200])
+        self.assertEqual(Schedule.objects.filter(user=self.user).count(), 2)
@@ -1,6 +1,9 @@
 from django.urls import include, path
 
+from . import views
+
 urlpatterns = [
     path("auth/", include("auth_api.urls")),
     path("scheduler/", include("scheduler.urls")),
+    path("batch/", views.BatchView.as_view(), name="batch"),
 ]
@@ -0,0 +1,142 @@
+import io
+import json
+from contextlib import nullcontext, suppress
+from typing import Any
+
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.db import transaction
+from django.http import HttpRequest, HttpResponseBase, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from scheduler_app.docs import document
+
+from .serializers import BatchSerializer
+
+API_PREFIX = "/api_v1/"
+
+# Request headers that describe the outer request body and must not leak into sub-requests
+BODY_META_KEYS = {"CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_CONTENT_ENCODING", "HTTP_TRANSFER_ENCODING"}
+
+
+class BatchView(APIView):
+    """Run several ``api_v1`` requests in one round trip.
+
+    The JWT is verified once for the batch; sub-requests reuse the authenticated user
+    and token through DRF's forced authentication instead of re-authenticating. They
+    are dispatched straight to the resolved views, bypassing middleware: the whole
+    batch is admitted by the load shedder once, at the batch's own (low) priority, and
+    its sub-requests are not classified individually.
+
+    Each sub-response is buffered into the batch response, so one whose body exceeds
+    ``BATCH_MAX_RESPONSE_BYTES`` (a long occurrence stream, say) is cut off and reported
+    as a 413; such requests should be made directly instead.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "batch"
+
+    @document("api_v1.docs.BATCH")
+    def post(self, request: Request) -> Response:
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sub_requests = serializer.validated_data["requests"]
+        atomic = serializer.validated_data["atomic"]
+
+        results: list[dict[str, Any]] = []
+        rolled_back = False
+        with transaction.atomic() if atomic else nullcontext():
+            for item in sub_requests:
+                results.append(self.dispatch_sub_request(request, item))
+                if atomic and results[-1]["status"] >= status.HTTP_400_BAD_REQUEST:
+                    transaction.set_rollback(True)
+                    rolled_back = True
+                    break
+        # Requests after a failing one in an atomic batch are never run
+        results += [{"status": None, "body": None} for _ in sub_requests[len(results) :]]
+        return Response({"rolled_back": rolled_back, "responses": results})
+
+    def build_sub_request(self, request: Request, item: dict[str, Any]) -> HttpRequest:
+        path, _, query_string = item["path"].partition("?")
+        body = b"" if item["body"] is None else json.dumps(item["body"]).encode()
+
+        sub_request = HttpRequest()
+        sub_request.method = item["method"]
+        sub_request.path = sub_request.path_info = API_PREFIX + path
+        sub_request.META = {key: value for key, value in request.META.items() if key not in BODY_META_KEYS}
+        sub_request.META.update(
+            REQUEST_METHOD=item["method"],
+            PATH_INFO=sub_request.path,
+            QUERY_STRING=query_string,
+            CONTENT_TYPE="application/json",
+            CONTENT_LENGTH=str(len(body)),
+        )
+        sub_request.GET = QueryDict(query_string)
+        sub_request._stream = io.BytesIO(body)
+        sub_request._read_started = False
+        # Picked up by rest_framework.request.Request: skips the authenticators
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+    def dispatch_sub_request(self, request: Request, item: dict[str, Any]) -> dict[str, Any]:
+        sub_request = self.build_sub_request(request, item)
+        try:
+            match = resolve(sub_request.path_info)
+        except Resolver404:
+            return {"status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+        if getattr(match.func, "view_class", None) is type(self):
+            return {"status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Batches cannot be nested."}}
+
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception as exc:  # noqa: BLE001 - same conversion Django applies to a top-level request
+            response = response_for_exception(sub_request, exc)
+        try:
+            content = self.read_content(response, settings.BATCH_MAX_RESPONSE_BYTES)
+        finally:
+            self.release(response)
+        if content is None:
+            return {
+                "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "body": {"detail": "Response too large for a batch; make this request on its own."},
+            }
+        return {"status": response.status_code, "body": self.response_body(response, content)}
+
+    def release(self, response: HttpResponseBase) -> None:
+        """Free what ``response.close()`` would (open files, stream generators).
+
+        close() itself also sends ``request_finished``, whose handler closes database
+        connections it considers stale; inside an atomic batch that would be the
+        connection running the batch's transaction.
+        """
+        for closer in response._resource_closers:
+            with suppress(Exception):  # as in HttpResponseBase.close()
+                closer()
+        response._resource_closers.clear()
+
+    def read_content(self, response: HttpResponseBase, limit: int) -> bytes | None:
+        """The response body, or None if it is longer than ``limit`` bytes."""
+        if hasattr(response, "render"):
+            response.render()
+        if not response.streaming:
+            return response.content if len(response.content) <= limit else None
+        # Stop pulling from the stream as soon as it is known to be too long
+        chunks, size = [], 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def response_body(self, response: HttpResponseBase, content: bytes) -> Any:
+        if not content:
+            return None
+        if response.get("Content-Type", "").startswith("application/json"):
+            return json.loads(content)
+        return content.decode(response.charset)
@@ -1,37 +1,32 @@
 from django.contrib.auth.models import User
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from django.db import transaction
 from rest_framework import generics, status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from scheduler import jobs
+from scheduler.serializers import JobSerializer
+from scheduler_app.docs import document
 
 from .serializers import SignupSerializer
 
 
+class LoginView(TokenObtainPairView):
+    throttle_scope = "auth.login"
+
+
+class RefreshTokenView(TokenRefreshView):
+    throttle_scope = "auth.refresh"
+
+
 class SignupView(generics.CreateAPIView):
     serializer_class = SignupSerializer
     permission_classes = [AllowAny]  # Publicly accessible
+    throttle_scope = "auth.signup"
 
-    @swagger_auto_schema(  # type: ignore
-        operation_description="Sign up a new user",
-        responses={
-            201: openapi.Response(
-                description="User created successfully",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "message": openapi.Schema(type=openapi.TYPE_STRING),
-                        "access": openapi.Schema(type=openapi.TYPE_STRING),
-                        "refresh": openapi.Schema(type=openapi.TYPE_STRING),
-                    },
-                ),
-            ),
-            400: openapi.Response(description="Bad request, username or email already exists"),
-        },
-        security=[],  # This removes the protected lock icon from Swagger for signup
-    )
+    @document("auth_api.docs.SIGNUP")
     def create(self, request: Request) -> Response:
         serializer = self.get_serializer(data=request.data)
 
@@ -59,3 +54,20 @@ class SignupView(generics.CreateAPIView):
             },
             status=status.HTTP_201_CREATED,
         )
+
+
+class AccountView(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "auth.account"
+
+    @document("auth_api.docs.DELETE_ACCOUNT")
+    def delete(self, request: Request) -> Response:
+        # Deactivating rejects the user's tokens right away; the cascade runs in a job.
+        # There is no Location to poll: the caller can't authenticate any more, and the
+        # job loses its user once the account is gone.
+        user = request.user
+        with transaction.atomic():
+            user.is_active = False
+            user.save(update_fields=["is_active"])
+            job = jobs.enqueue("delete_account", {"user": user.pk}, user=user)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,67 @@
+"""Compare per-request connection setup against persistent connections.
+
+Usage::
+
+    python benchmarks/connection_setup.py [iterations]
+
+Runs against ``DATABASES["default"]`` as configured by the current environment, so
+point ``ENVIRONMENT``/``*_DATABASE_URL`` at the database you want to measure.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "scheduler_app.settings")
+
+import django
+
+django.setup()
+
+from django.db import connections  # noqa: E402
+
+
+def run_query(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def bench_fresh_connection(iterations: int) -> float:
+    """What CONN_MAX_AGE=0 does: connect, run one query, close at the end of the request."""
+    connection = connections["default"]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run_query(connection)
+        connection.close()
+    return time.perf_counter() - start
+
+
+def bench_persistent_connection(iterations: int) -> float:
+    """Persistent connection with the health check Django runs at the start of each request."""
+    connection = connections["default"]
+    run_query(connection)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        connection.close_if_unusable_or_obsolete()
+        run_query(connection)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    vendor = connections["default"].vendor
+    fresh = bench_fresh_connection(iterations)
+    persistent = bench_persistent_connection(iterations)
+    sys.stdout.write(f"backend: {vendor}, iterations: {iterations}\n")
+    sys.stdout.write(f"fresh connection per request: {fresh / iterations * 1e6:10.1f} us/request\n")
+    sys.stdout.write(f"persistent connection:        {persistent / iterations * 1e6:10.1f} us/request\n")
+    sys.stdout.write(f"saved per request:            {(fresh - persistent) / iterations * 1e6:10.1f} us\n")
+
+
+if __name__ == "__main__":
+    main()
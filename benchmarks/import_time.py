@@ -0,0 +1,87 @@
+"""Measure worker cold-start import cost with ``python -X importtime``.
+
+Usage::
+
+    python -m benchmarks.import_time [--top N]
+
+Imports the WSGI application and resolves the URLconf (what a worker does before it
+serves its first request) in a fresh interpreter, using the current environment.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Cold-start budget enforced by the test suite, for a worker with the docs stack disabled.
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+COLD_START = "\n".join(
+    [
+        "import scheduler_app.wsgi",
+        "from django.urls import get_resolver",
+        "get_resolver().url_patterns",
+    ]
+)
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        records.append(ImportRecord(module.strip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def measure_cold_start(env: dict[str, str] | None = None) -> list[ImportRecord]:
+    run_env = {**os.environ, "DJANGO_SETTINGS_MODULE": "scheduler_app.settings", **(env or {})}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", COLD_START],
+        cwd=BASE_DIR,
+        env=run_env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: list[ImportRecord]) -> float:
+    return sum(record.self_us for record in records) / 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15, help="number of slowest top-level packages to show")
+    args = parser.parse_args()
+
+    for label, env in (("docs enabled", {"API_DOCS_ENABLED": "1"}), ("docs disabled", {"API_DOCS_ENABLED": "0"})):
+        records = measure_cold_start(env)
+        sys.stdout.write(
+            f"{label}: {total_ms(records):.1f} ms across {len(records)} modules (budget {BUDGET_MS:.0f} ms)\n"
+        )
+        packages: dict[str, int] = {}
+        for record in records:
+            package = record.module.lstrip().split(".")[0]
+            packages[package] = packages.get(package, 0) + record.self_us
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+            sys.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}\n")
+
+
+if __name__ == "__main__":
+    main()
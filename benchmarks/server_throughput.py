@@ -0,0 +1,103 @@
+"""Compare request throughput of ``manage.py runserver`` and ``manage.py serve``.
+
+Usage::
+
+    python -m benchmarks.server_throughput [--path /api_v1/scheduler/schedules/] [--seconds 10] [--concurrency 32]
+
+Each server is started in turn on a free local port and hit by ``--concurrency``
+client threads for ``--seconds``; the path defaults to an unauthenticated schedule
+list, which goes through the full middleware, authentication and routing stack.
+"""
+
+import argparse
+import http.client
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def hammer(port: int, path: str, seconds: float, concurrency: int) -> tuple[int, int]:
+    deadline = time.monotonic() + seconds
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def client() -> None:
+        ok = errors = 0
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < deadline:
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                ok += 1
+                if response.will_close:
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+        with lock:
+            counts["ok"] += ok
+            counts["errors"] += errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    return counts["ok"], counts["errors"]
+
+
+def bench(name: str, command: list[str], port: int, args: argparse.Namespace) -> None:
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, "manage.py", *command],
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_listening(port)
+        hammer(port, args.path, 1, args.concurrency)  # warm up
+        ok, errors = hammer(port, args.path, args.seconds, args.concurrency)
+    finally:
+        process.terminate()
+        process.wait()
+    sys.stdout.write(f"{name:<10} {ok / args.seconds:10.1f} req/s  ({errors} errors)\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/api_v1/scheduler/schedules/")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    port = free_port()
+    bench("runserver", ["runserver", "--noreload", f"127.0.0.1:{port}"], port, args)
+    port = free_port()
+    pidfile = f"/tmp/bench-{port}.pid"  # noqa: S108
+    bench("serve", ["serve", "--bind", f"127.0.0.1:{port}", "--pidfile", pidfile], port, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+from drf_yasg import openapi
+
+from .serializers import BulkImportSerializer, ScheduleSerializer
+
+# swagger_auto_schema overrides for ScheduleViewSet, attached lazily via scheduler_app.docs.document
+
+CREATE_SCHEDULE = {
+    "operation_description": "Create a new schedule with time slots for each day of the week.",
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "schedule": openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                example={
+                    "monday": [
+                        {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
+                        {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
+                    ],
+                },
+            )
+        },
+    ),
+    "responses": {
+        201: openapi.Response(
+            description="Schedule created successfully",
+            examples={
+                "application/json": {
+                    "id": 1,
+                    "schedule": {
+                        "monday": [
+                            {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
+                            {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
+                        ],
+                        "tuesday": [{"start": "09:00", "stop": "11:00", "ids": [5, 6]}],
+                    },
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Invalid input",
+            examples={"application/json": {"schedule": {"funday": ["Invalid day: funday"]}}},
+        ),
+    },
+}
+
+LIST_SCHEDULES = {
+    "operation_description": "Get all schedules, with details for each day of the week.",
+    "responses": {
+        200: openapi.Response(
+            description="List of schedules",
+            examples={
+                "application/json": [
+                    {
+                        "id": 1,
+                        "schedule": {
+                            "monday": [
+                                {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
+                                {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
+                            ]
+                        },
+                        "user": "username",  # Include user in the example response if you like
+                    }
+                ]
+            },
+        )
+    },
+}
+
+RETRIEVE_SCHEDULE = {
+    "operation_description": "Retrieve a specific schedule by its ID.",
+    "responses": {
+        200: openapi.Response(
+            description="Details of the schedule",
+            examples={
+                "application/json": {
+                    "id": 1,
+                    "schedule": {
+                        "monday": [
+                            {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
+                            {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
+                        ]
+                    },
+                    "user": "username",
+                }
+            },
+        ),
+        404: openapi.Response(
+            description="Schedule not found",
+            examples={"application/json": {"detail": "Not found."}},
+        ),
+    },
+}
+
+UPDATE_SCHEDULE = {
+    "operation_description": "Update a specific schedule by its ID.",
+    "request_body": ScheduleSerializer,
+    "responses": {
+        200: openapi.Response(
+            description="Schedule updated successfully",
+            examples={
+                "application/json": {
+                    "id": 1,
+                    "schedule": {"tuesday": [{"start": "09:00", "stop": "11:00", "ids": [5, 6]}]},
+                    "user": "username",
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Invalid input",
+            examples={"application/json": {"schedule": {"monday": ["Missing 'start' field"]}}},
+        ),
+        404: openapi.Response(
+            description="Schedule not found",
+            examples={"application/json": {"detail": "Not found."}},
+        ),
+    },
+}
+
+DESTROY_SCHEDULE = {
+    "operation_description": "Delete a specific schedule by its ID.",
+    "responses": {
+        204: openapi.Response(
+            description="Schedule deleted successfully",
+            examples={"application/json": None},
+        ),
+        404: openapi.Response(
+            description="Schedule not found",
+            examples={"application/json": {"detail": "Not found."}},
+        ),
+    },
+}
+
+OCCURRENCE_PARAMETERS = [
+    openapi.Parameter(
+        "from",
+        openapi.IN_QUERY,
+        description="First date (YYYY-MM-DD, inclusive); defaults to today in `tz`.",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "to",
+        openapi.IN_QUERY,
+        description="Last date (YYYY-MM-DD, inclusive); defaults to six days after `from`.",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "tz",
+        openapi.IN_QUERY,
+        description="IANA time zone the weekly time slots are interpreted in, e.g. Europe/Berlin. Defaults to UTC.",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
+OCCURRENCE_EXAMPLE = {
+    "schedule": 1,
+    "day": "monday",
+    "start": "2024-03-25T08:00:00+01:00",
+    "end": "2024-03-25T10:00:00+01:00",
+    "ids": [1, 2],
+}
+
+SCHEDULE_OCCURRENCES = {
+    "operation_description": (
+        "Stream the concrete dated occurrences of a schedule's weekly time slots. "
+        "Request `occurrences.ics`, `?format=ics` or `Accept: text/calendar` for an iCalendar export."
+    ),
+    "produces": ["application/json", "text/calendar"],
+    "manual_parameters": OCCURRENCE_PARAMETERS,
+    "responses": {
+        200: openapi.Response(
+            description="Occurrences in chronological order",
+            examples={"application/json": [OCCURRENCE_EXAMPLE]},
+        ),
+        400: openapi.Response(
+            description="Invalid range, time zone or schedule",
+            examples={"application/json": {"tz": ["Unknown time zone: Mars/Olympus"]}},
+        ),
+        404: openapi.Response(
+            description="Schedule not found",
+            examples={"application/json": {"detail": "Not found."}},
+        ),
+    },
+}
+
+ALL_OCCURRENCES = {
+    "operation_description": (
+        "Stream the occurrences of all schedules, ordered by schedule and then by time. "
+        "Request `occurrences.ics`, `?format=ics` or `Accept: text/calendar` for an iCalendar export."
+    ),
+    "produces": ["application/json", "text/calendar"],
+    "manual_parameters": OCCURRENCE_PARAMETERS,
+    "responses": {
+        200: openapi.Response(
+            description="Occurrences of every schedule",
+            examples={"application/json": [OCCURRENCE_EXAMPLE]},
+        ),
+    },
+}
+
+SCHEDULE_STATS = {
+    "operation_description": (
+        "Booked minutes and time slots per weekday over all your schedules, and the distinct resource ids "
+        "they reference. Overnight slots count towards the day they start on."
+    ),
+    "responses": {
+        200: openapi.Response(
+            description="Usage summary",
+            examples={
+                "application/json": {
+                    "days": {
+                        "monday": {"minutes": 210, "slots": 2},
+                        "tuesday": {"minutes": 120, "slots": 1},
+                        "wednesday": {"minutes": 0, "slots": 0},
+                        "thursday": {"minutes": 0, "slots": 0},
+                        "friday": {"minutes": 0, "slots": 0},
+                        "saturday": {"minutes": 0, "slots": 0},
+                        "sunday": {"minutes": 0, "slots": 0},
+                    },
+                    "minutes": 330,
+                    "slots": 3,
+                    "resources": 3,
+                    "resource_ids": [1, 2, "room-7"],
+                }
+            },
+        )
+    },
+}
+
+JOB_EXAMPLE = {
+    "id": 7,
+    "kind": "bulk_import",
+    "status": "running",
+    "progress": 0.4,
+    "attempts": 1,
+    "max_attempts": 3,
+    "result": {
+        "processed": 400,
+        "created": 399,
+        "errors": [{"index": 12, "errors": {"schedule": ["Invalid day: funday"]}}],
+    },
+    "error": "",
+    "created_at": "2024-03-25T08:00:00Z",
+    "finished_at": None,
+}
+
+BULK_IMPORT = {
+    "operation_description": (
+        "Queue the creation of many schedules. Each item is a create request body; items are validated by the "
+        "job and invalid ones are reported in its result. Poll the job (`Location` header) for progress."
+    ),
+    "request_body": BulkImportSerializer,
+    "responses": {
+        202: openapi.Response(
+            description="Import queued",
+            examples={"application/json": JOB_EXAMPLE | {"status": "queued", "progress": 0, "result": None}},
+        ),
+        400: openapi.Response(
+            description="Invalid input",
+            examples={"application/json": {"schedules": ["This list may not be empty."]}},
+        ),
+    },
+}
+
+LIST_JOBS = {
+    "operation_description": "List your background jobs, newest first.",
+    "responses": {200: openapi.Response(description="Jobs", examples={"application/json": [JOB_EXAMPLE]})},
+}
+
+RETRIEVE_JOB = {
+    "operation_description": "Status, progress and result of a background job.",
+    "responses": {
+        200: openapi.Response(description="The job", examples={"application/json": JOB_EXAMPLE}),
+        404: openapi.Response(
+            description="Job not found",
+            examples={"application/json": {"detail": "Not found."}},
+        ),
+    },
+}
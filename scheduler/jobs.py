@@ -0,0 +1,217 @@
+import logging
+import threading
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, Schedule, bump_schedule_version, rebuild_usage, record_usage
+from .serializers import ScheduleSerializer
+from .stats import summarize_all
+
+logger = logging.getLogger(__name__)
+
+# Rows written or deleted per transaction by the built-in handlers
+BATCH_SIZE = 500
+
+# Per-item validation errors kept in a bulk import's result
+MAX_REPORTED_ERRORS = 100
+
+# How often a worker retries when another worker claimed the job it picked first (SQLite)
+CLAIM_RETRIES = 5
+
+HANDLERS: dict[str, Callable[[Job], Any]] = {}
+
+
+def handler(kind: str) -> Callable[[Callable[[Job], Any]], Callable[[Job], Any]]:
+    """Register the function running jobs of ``kind``.
+
+    Handlers must be safe to run again after a failure part way through: a retried job
+    starts from the checkpoint last saved with :func:`save_progress`.
+    """
+
+    def register(fn: Callable[[Job], Any]) -> Callable[[Job], Any]:
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+def enqueue(kind: str, payload: dict[str, Any], user: User | None = None) -> Job:
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, payload=payload, user=user, max_attempts=settings.JOB_MAX_ATTEMPTS)
+
+
+def save_progress(job: Job, done: int, total: int, result: dict[str, Any] | None = None) -> None:
+    """Record progress (and a checkpoint in ``result``); also renews the worker's lock on the job."""
+    job.progress = done / total if total else 1.0
+    job.locked_at = timezone.now()
+    fields = ["progress", "locked_at"]
+    if result is not None:
+        job.result = result
+        fields.append("result")
+    job.save(update_fields=fields)
+
+
+def claim(worker: str) -> Job | None:
+    """Take the oldest due job off the queue, or return None when there is nothing to do.
+
+    Databases with ``SELECT ... FOR UPDATE SKIP LOCKED`` (Postgres) let concurrent
+    workers each lock a different row without waiting. SQLite has no row locks, so the
+    job is claimed with a conditional UPDATE that only one worker can win; the losers
+    pick again.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now).order_by("run_at", "id")
+    claimed = {
+        "status": Job.Status.RUNNING,
+        "locked_by": worker,
+        "locked_at": now,
+        "attempts": F("attempts") + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = due.select_for_update(skip_locked=True).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+            Job.objects.filter(pk=pk).update(**claimed)
+        return Job.objects.get(pk=pk)
+
+    for _ in range(CLAIM_RETRIES):
+        pk = due.values_list("pk", flat=True).first()
+        if pk is None:
+            return None
+        if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(**claimed):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job: Job) -> None:
+    """Run a claimed job and record its outcome, rescheduling it with backoff if it may be retried."""
+    fn = HANDLERS.get(job.kind)
+    # A job requeued by requeue_stale() and claimed by another worker is no longer ours to update
+    ours = Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status=Job.Status.RUNNING)
+    try:
+        if fn is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        result = fn(job)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.kind, job.attempts)
+        error = f"{type(exc).__name__}: {exc}"
+        if fn is not None and job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            ours.update(
+                status=Job.Status.QUEUED,
+                error=error,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                locked_by="",
+                locked_at=None,
+            )
+        else:
+            ours.update(status=Job.Status.FAILED, error=error, finished_at=timezone.now())
+        return
+    ours.update(
+        status=Job.Status.SUCCEEDED,
+        progress=1.0,
+        result=result if result is not None else job.result,
+        error="",
+        finished_at=timezone.now(),
+    )
+
+
+def requeue_stale() -> int:
+    """Put back jobs whose worker went silent for ``JOB_LOCK_TIMEOUT`` seconds (crashed or killed)."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff)
+    lost = "Worker stopped responding"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, error=lost, finished_at=timezone.now()
+    )
+    requeued = stale.update(status=Job.Status.QUEUED, error=lost, locked_by="", locked_at=None)
+    return failed + requeued
+
+
+def work(worker: str, stop: threading.Event | None = None, burst: bool = False) -> int:
+    """Claim and run jobs until ``stop`` is set (or, with ``burst``, the queue is empty).
+
+    Returns the number of jobs run.
+    """
+    stop = stop or threading.Event()
+    ran = 0
+    while not stop.is_set():
+        job = claim(worker)
+        if job is None:
+            if requeue_stale():
+                continue
+            if burst:
+                break
+            stop.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        run(job)
+        ran += 1
+    return ran
+
+
+@handler("bulk_import")
+def bulk_import(job: Job) -> dict[str, Any]:
+    """Create ``payload["schedules"]`` (request bodies of the create endpoint) for the job's user."""
+    items = job.payload["schedules"]
+    if job.user_id is None:
+        raise ValueError("The importing user no longer exists")
+    state = job.result or {"processed": 0, "created": 0, "errors": []}
+    for offset in range(state["processed"], len(items), BATCH_SIZE):
+        batch = []
+        for index, item in enumerate(items[offset : offset + BATCH_SIZE], offset):
+            serializer = ScheduleSerializer(data=item)
+            if serializer.is_valid():
+                batch.append(Schedule(user_id=job.user_id, schedule=serializer.validated_data["schedule"]))
+            elif len(state["errors"]) < MAX_REPORTED_ERRORS:
+                state["errors"].append({"index": index, "errors": serializer.errors})
+        state["processed"] = min(offset + BATCH_SIZE, len(items))
+        state["created"] += len(batch)
+        # The checkpoint commits with the batch, so a retry neither skips nor repeats rows
+        with transaction.atomic():
+            Schedule.objects.bulk_create(batch)
+            record_usage(job.user_id, summarize_all(schedule.schedule for schedule in batch))
+            bump_schedule_version(job.user_id)
+            save_progress(job, state["processed"], len(items), state)
+    return state
+
+
+@handler("delete_account")
+def delete_account(job: Job) -> dict[str, Any]:
+    """Delete a user and all their schedules, a batch at a time.
+
+    The user's usage summary isn't maintained along the way; it goes with the user.
+    """
+    user_id = job.payload["user"]
+    deleted = (job.result or {}).get("deleted", 0)
+    schedules = Schedule.objects.filter(user_id=user_id)
+    total = deleted + schedules.count()
+    while batch := list(schedules.order_by("pk").values_list("pk", flat=True)[:BATCH_SIZE]):
+        with transaction.atomic():
+            Schedule.objects.filter(pk__in=batch).delete()
+            bump_schedule_version(user_id)
+            deleted += len(batch)
+            save_progress(job, deleted, total, {"deleted": deleted})
+    User.objects.filter(pk=user_id).delete()
+    return {"deleted": deleted}
+
+
+@handler("recompute_usage")
+def recompute_usage(job: Job) -> dict[str, Any]:
+    """Rebuild a user's usage summary from all their schedules, e.g. after its definition changed."""
+    user_id = job.payload["user"]
+    with transaction.atomic():
+        # Locks the schedules (where supported) so concurrent updates wait for the rebuild
+        schedules = Schedule.objects.select_for_update().filter(user_id=user_id).order_by("pk")
+        usage = summarize_all(schedules.values_list("schedule", flat=True).iterator(chunk_size=BATCH_SIZE))
+        rebuild_usage(user_id, usage)
+    return {"slots": sum(usage.slots.values()), "resources": len(usage.resources)}
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Pre-generate the OpenAPI schema (JSON, YAML and gzipped copies) served by /swagger.json."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            type=Path,
+            default=None,
+            help="Directory to write the schema files to (defaults to settings.OPENAPI_SCHEMA_DIR).",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.API_DOCS_ENABLED:
+            # The files are only served by the docs URLs, which aren't mounted
+            self.stdout.write("API docs are disabled (API_DOCS_ENABLED); no schema written")
+            return
+
+        from scheduler_app.openapi import write_schema_files
+
+        for path in write_schema_files(options["output_dir"]):
+            self.stdout.write(f"Wrote {path}")
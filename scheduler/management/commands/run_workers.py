@@ -0,0 +1,54 @@
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from scheduler import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background job workers (bulk imports, account deletions) until SIGINT/SIGTERM. "
+        "Workers finish the job in hand before exiting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Worker threads (default: %(default)s).")
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new jobs.",
+        )
+
+    def work(self, name: str, stop: threading.Event, burst: bool, counts: list[int]) -> None:
+        try:
+            counts.append(jobs.work(name, stop, burst=burst))
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        previous = {sig: signal.signal(sig, lambda *_: stop.set()) for sig in (signal.SIGINT, signal.SIGTERM)}
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        counts: list[int] = []
+        try:
+            if options["concurrency"] <= 1:
+                counts.append(jobs.work(f"{prefix}:0", stop, burst=options["burst"]))
+            else:
+                threads = [
+                    threading.Thread(target=self.work, args=(f"{prefix}:{n}", stop, options["burst"], counts))
+                    for n in range(options["concurrency"])
+                ]
+                for thread in threads:
+                    thread.start()
+                # Joining with a timeout keeps the main thread responsive to signals
+                while any(thread.is_alive() for thread in threads):
+                    for thread in threads:
+                        thread.join(0.5)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        self.stdout.write(f"Ran {sum(counts)} jobs")
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from scheduler_app.server import (
+    WSGI_APPLICATION,
+    Server,
+    default_workers,
+    graceful_reload,
+    server_options,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the application under a pre-forking gunicorn server. "
+        "Use --reload to gracefully replace an already running server with the current code."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="0.0.0.0:8000", help="Address to listen on (default: %(default)s).")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help=f"Worker processes (default: WEB_CONCURRENCY or 2 * CPUs + 1, currently {default_workers()}).",
+        )
+        parser.add_argument("--threads", type=int, default=1, help="Threads per worker; >1 uses gthread workers.")
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=1000,
+            help="Recycle a worker after this many requests to bound memory growth (0 disables).",
+        )
+        parser.add_argument("--max-requests-jitter", type=int, default=100)
+        parser.add_argument("--timeout", type=int, default=30, help="Kill workers silent for this many seconds.")
+        parser.add_argument("--graceful-timeout", type=int, default=30)
+        parser.add_argument("--pidfile", type=Path, default=Path("/tmp/scheduler_app.pid"))  # noqa: S108
+        parser.add_argument(
+            "--reload",
+            action="store_true",
+            help=(
+                "Zero-downtime reload of the server whose pid is in --pidfile, then exit. "
+                "Not for containers, where the old master is the main process."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["reload"]:
+            try:
+                new_pid = graceful_reload(options["pidfile"])
+            except RuntimeError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(f"Reloaded, new master pid {new_pid}")
+            return
+
+        server_options_ = server_options(
+            bind=options["bind"],
+            workers=options["workers"],
+            threads=options["threads"],
+            max_requests=options["max_requests"],
+            max_requests_jitter=options["max_requests_jitter"],
+            timeout=options["timeout"],
+            graceful_timeout=options["graceful_timeout"],
+            pidfile=options["pidfile"],
+        )
+        Server(WSGI_APPLICATION, server_options_).run()
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-19 10:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def queue_recompute(apps, schema_editor):
+    # Summarizing every existing schedule can take long on big tenants, so it is left to
+    # the job workers rather than done while migrating.
+    Job = apps.get_model("scheduler", "Job")
+    Schedule = apps.get_model("scheduler", "Schedule")
+    user_ids = Schedule.objects.order_by().values_list("user_id", flat=True).distinct()
+    Job.objects.bulk_create(Job(kind="recompute_usage", payload={"user": user_id}) for user_id in user_ids.iterator())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scheduler", "0005_job"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DayUsage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.PositiveSmallIntegerField()),
+                ("minutes", models.IntegerField(default=0)),
+                ("slots", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="day_usage",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("user", "day"), name="scheduler_dayusage_user_day")],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResourceUsage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("resource", models.TextField()),
+                ("digest", models.CharField(max_length=64)),
+                ("slots", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resource_usage",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "digest"), name="scheduler_resourceusage_user_digest")
+                ],
+            },
+        ),
+        migrations.RunPython(queue_recompute, migrations.RunPython.noop),
+    ]
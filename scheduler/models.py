@@ -1,5 +1,11 @@
+from collections import defaultdict
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .stats import Usage, resource_digest, summarize
 
 
 class Schedule(models.Model):
@@ -8,3 +14,241 @@ class Schedule(models.Model):
 
     def __str__(self):
         return f"Schedule {self.id}"
+
+    # Saving and deleting keep the owner's DayUsage/ResourceUsage in step by applying the
+    # difference between the stored and the new JSON, and bump the owner's write version.
+    # Bulk queryset operations bypass this and must call record_usage() and
+    # bump_schedule_version() themselves.
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_user_id, old_schedule = self._stored()
+            super().save(*args, **kwargs)
+            old_usage, new_usage = summarize(old_schedule), summarize(self.schedule)
+            if old_user_id is not None and old_user_id != self.user_id:
+                record_usage(old_user_id, -old_usage)
+                record_usage(self.user_id, new_usage)
+                bump_schedule_version(old_user_id, self.user_id)
+            else:
+                record_usage(self.user_id, new_usage - old_usage)
+                bump_schedule_version(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_user_id, old_schedule = self._stored()
+            result = super().delete(*args, **kwargs)
+            if old_user_id is not None:
+                record_usage(old_user_id, -summarize(old_schedule))
+                bump_schedule_version(old_user_id)
+            return result
+
+    def _stored(self) -> tuple[int | None, object]:
+        if self._state.adding or self.pk is None:
+            return None, {}
+        # Locks the row (where supported) so concurrent updates diff against each other's result
+        stored = Schedule.objects.select_for_update().filter(pk=self.pk).values_list("user_id", "schedule").first()
+        return stored or (None, {})
+
+
+class DayUsage(models.Model):
+    """Booked minutes and time slots of a user's schedules on one weekday (0 is Monday)."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="day_usage")
+    day = models.PositiveSmallIntegerField()
+    minutes = models.IntegerField(default=0)
+    slots = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "day"], name="scheduler_dayusage_user_day")]
+
+    def __str__(self):
+        return f"Day {self.day} usage of user {self.user_id}"
+
+
+class ResourceUsage(models.Model):
+    """Number of a user's time slots referencing a resource id; rows exist while it is > 0."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="resource_usage")
+    # JSON encoded id (scheduler.stats.resource_key); ids can be arbitrarily long, so rows
+    # are identified by the fixed-length digest of it instead
+    resource = models.TextField()
+    digest = models.CharField(max_length=64)
+    slots = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "digest"], name="scheduler_resourceusage_user_digest")]
+
+    def __str__(self):
+        return f"Resource {self.resource[:40]} usage of user {self.user_id}"
+
+
+class ScheduleActivity(models.Model):
+    """Per-user bookkeeping of schedule writes.
+
+    ``version`` goes up in the transaction of every write to the user's schedules, so a
+    read that sees a version was started after all writes up to it had committed.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="schedule_activity")
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Schedule activity of user {self.user_id}"
+
+
+class ScheduleRead(models.Model):
+    """When a user last read their schedules.
+
+    Each process records a user's reads at most every ``SCHEDULE_READ_RECORD_INTERVAL``
+    seconds. Kept apart from ScheduleActivity, whose row stays locked until a write
+    commits, so recording a read never waits for a write.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="schedule_read")
+    read_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Schedule read of user {self.user_id}"
+
+
+def _increment(
+    model: type[models.Model], lookup: dict[str, object], defaults: dict[str, object] | None = None, **deltas: int
+) -> None:
+    increments = {name: F(name) + delta for name, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **deltas)
+    except IntegrityError:  # created concurrently
+        model.objects.filter(**lookup).update(**increments)
+
+
+def record_usage(user_id: int, delta: Usage) -> None:
+    """Apply a usage difference to a user's summary rows, touching only the changed days and resources."""
+    if not delta:
+        return
+    with transaction.atomic(savepoint=False):
+        for day in sorted(delta.minutes.keys() | delta.slots.keys()):
+            _increment(DayUsage, {"user_id": user_id, "day": day}, minutes=delta.minutes[day], slots=delta.slots[day])
+        digests = {resource: resource_digest(resource) for resource in delta.resources}
+        for resource in sorted(delta.resources, key=digests.__getitem__):
+            _increment(
+                ResourceUsage,
+                {"user_id": user_id, "digest": digests[resource]},
+                {"resource": resource},
+                slots=delta.resources[resource],
+            )
+        released = [digests[resource] for resource, count in delta.resources.items() if count < 0]
+        if released:
+            ResourceUsage.objects.filter(user_id=user_id, digest__in=released, slots__lte=0).delete()
+
+
+def bump_schedule_version(*user_ids: int) -> None:
+    """Record a write to these users' schedules; call it in the transaction making the write."""
+    with transaction.atomic(savepoint=False):
+        for user_id in sorted(set(user_ids)):
+            _increment(ScheduleActivity, {"user_id": user_id}, version=1)
+
+
+def schedule_version(user_id: int) -> int:
+    """The user's current write version (0 before their first write)."""
+    return ScheduleActivity.objects.filter(user_id=user_id).values_list("version", flat=True).first() or 0
+
+
+def record_read(user_id: int) -> None:
+    """Stamp the user's latest schedule read."""
+    now = timezone.now()
+    if ScheduleRead.objects.filter(user_id=user_id).update(read_at=now):
+        return
+    try:
+        with transaction.atomic():
+            ScheduleRead.objects.create(user_id=user_id, read_at=now)
+    except IntegrityError:  # recorded concurrently
+        ScheduleRead.objects.filter(user_id=user_id).update(read_at=now)
+
+
+def recent_readers(limit: int) -> list[int]:
+    """Ids of the active users who read their schedules most recently, latest first."""
+    readers = ScheduleRead.objects.filter(user__is_active=True).order_by("-read_at")
+    return list(readers.values_list("user_id", flat=True)[:limit])
+
+
+def rebuild_usage(user_id: int, usage: Usage) -> None:
+    """Replace a user's summary rows with ``usage``, e.g. one recomputed from all their schedules."""
+    with transaction.atomic():
+        DayUsage.objects.filter(user_id=user_id).delete()
+        ResourceUsage.objects.filter(user_id=user_id).delete()
+        DayUsage.objects.bulk_create(
+            DayUsage(user_id=user_id, day=day, minutes=usage.minutes[day], slots=usage.slots[day])
+            for day in sorted(usage.minutes.keys() | usage.slots.keys())
+        )
+        ResourceUsage.objects.bulk_create(
+            ResourceUsage(user_id=user_id, resource=resource, digest=resource_digest(resource), slots=count)
+            for resource, count in usage.resources.items()
+        )
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_workers`` (see ``scheduler.jobs``)."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    # Kept (as NULL) when the user is deleted, e.g. by their own account deletion job
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Fraction of the work done, from 0 to 1
+    progress = models.FloatField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="scheduler_job_queue_idx"),
+            # The admin's kind filter: its choices and its newest-first filtered pages
+            models.Index(fields=["kind", "id"], name="scheduler_job_kind_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.kind}, {self.status})"
+
+
+def delete_schedules(schedules: models.QuerySet, batch_size: int = 1000) -> int:
+    """Delete a queryset of schedules in batches, keeping the owners' usage summaries right.
+
+    Each batch is one transaction: lock and read the batch's JSON, delete it by primary
+    key, and apply one usage decrement per owner. Returns the number of schedules deleted.
+    """
+    deleted = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                schedules.select_for_update()
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "user_id", "schedule")[:batch_size]
+            )
+            if not batch:
+                return deleted
+            usage: defaultdict[int, Usage] = defaultdict(Usage)
+            for _, user_id, schedule in batch:
+                usage[user_id] += summarize(schedule)
+            deleted += Schedule.objects.filter(pk__in=[pk for pk, _, _ in batch]).delete()[0]
+            for user_id, user_usage in usage.items():
+                record_usage(user_id, -user_usage)
+            bump_schedule_version(*usage)
+        last_pk = batch[-1][0]
@@ -0,0 +1,147 @@
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+from typing import Any
+
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Occurrences per chunk written to a streaming response
+STREAM_CHUNK_SIZE = 200
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    start: time
+    # Days after the occurrence date on which the slot ends: 1 for "24:00" or overnight slots
+    stop_day_offset: int
+    stop: time
+    ids: tuple[Any, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Occurrence:
+    schedule_id: int
+    day: str
+    start: datetime
+    end: datetime
+    ids: tuple[Any, ...]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schedule": self.schedule_id,
+            "day": self.day,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "ids": list(self.ids),
+        }
+
+
+def parse_time(value: str) -> tuple[time, int]:
+    """Parse "HH:MM" (or "HH:MM:SS"); "24:00" means midnight at the end of the day."""
+    if value in ("24:00", "24:00:00"):
+        return time(0, 0), 1
+    return time.fromisoformat(value), 0
+
+
+def compile_template(schedule: dict[str, Any]) -> tuple[tuple[Slot, ...], ...]:
+    """Turn a weekly ``Schedule.schedule`` into per-weekday slots sorted by start time.
+
+    Raises ``ValueError`` for unknown days or malformed times, so problems surface before
+    a response starts streaming.
+    """
+    days: list[list[Slot]] = [[] for _ in DAYS_OF_WEEK]
+    for day, slots in schedule.items():
+        if day not in DAYS_OF_WEEK:
+            raise ValueError(f"Invalid day: {day}")
+        for slot in slots:
+            try:
+                start, start_offset = parse_time(slot["start"])
+                stop, stop_offset = parse_time(slot["stop"])
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid time slot on {day}: {slot}") from exc
+            if start_offset:
+                raise ValueError(f"Invalid time slot on {day}: {slot}")
+            if not stop_offset and stop <= start:
+                stop_offset = 1  # overnight slot, e.g. 22:00-02:00
+            days[DAYS_OF_WEEK.index(day)].append(Slot(start, stop_offset, stop, tuple(slot.get("ids", ()))))
+    return tuple(tuple(sorted(slots, key=lambda slot: slot.start)) for slots in days)
+
+
+def localize(day: date, at: time, tz: tzinfo) -> datetime:
+    # fold=0 picks the first of two ambiguous wall times when clocks go back; the UTC
+    # round trip moves wall times skipped when clocks go forward past the gap.
+    return datetime.combine(day, at, tzinfo=tz).astimezone(UTC).astimezone(tz)
+
+
+def expand(
+    schedule_id: int,
+    template: tuple[tuple[Slot, ...], ...],
+    start: date,
+    end: date,
+    tz: tzinfo,
+) -> Iterator[Occurrence]:
+    """Lazily yield the occurrences of a compiled template starting between ``start`` and ``end`` inclusive."""
+    day = start
+    one_day = timedelta(days=1)
+    while day <= end:
+        weekday = day.weekday()
+        for slot in template[weekday]:
+            yield Occurrence(
+                schedule_id=schedule_id,
+                day=DAYS_OF_WEEK[weekday],
+                start=localize(day, slot.start, tz),
+                end=localize(day + timedelta(days=slot.stop_day_offset), slot.stop, tz),
+                ids=slot.ids,
+            )
+        day += one_day
+
+
+def stream_json(occurrences: Iterable[Occurrence]) -> Iterator[str]:
+    """Encode occurrences as a JSON array, one chunk per ``STREAM_CHUNK_SIZE`` items."""
+    yield "["
+    separator = ""
+    chunk: list[str] = []
+    for occurrence in occurrences:
+        chunk.append(json.dumps(occurrence.as_dict()))
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
+
+
+def _ical_datetime(value: datetime) -> str:
+    return value.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ical_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def stream_ical(occurrences: Iterable[Occurrence], host: str = "scheduler_app") -> Iterator[str]:
+    """Encode occurrences as an iCalendar (RFC 5545) feed with times in UTC."""
+    stamp = _ical_datetime(datetime.now(UTC))
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//scheduler_app//occurrences//EN\r\nCALSCALE:GREGORIAN\r\n"
+    chunk: list[str] = []
+    for occurrence in occurrences:
+        start = _ical_datetime(occurrence.start)
+        ids = ", ".join(str(resource_id) for resource_id in occurrence.ids)
+        chunk.append(
+            "BEGIN:VEVENT\r\n"
+            f"UID:{occurrence.schedule_id}-{start}@{host}\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART:{start}\r\n"
+            f"DTEND:{_ical_datetime(occurrence.end)}\r\n"
+            f"SUMMARY:Schedule {occurrence.schedule_id}\r\n"
+            f"DESCRIPTION:{_ical_escape('ids: ' + ids)}\r\n"
+            "END:VEVENT\r\n"
+        )
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    yield "END:VCALENDAR\r\n"
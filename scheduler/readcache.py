@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class ReadCache:
+    """Thread-safe least-recently-used mapping, kept per process.
+
+    ``max_entries`` is called on each insert, so the size can follow a setting; with 0
+    nothing is kept. Callers make stale entries unreachable through their keys (e.g. by
+    a version in the key) rather than by invalidating them.
+    """
+
+    def __init__(self, max_entries: Callable[[], int]) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        max_entries = self.max_entries()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
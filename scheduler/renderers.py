@@ -0,0 +1,25 @@
+import json
+
+from rest_framework import renderers
+
+from .occurrences import stream_ical
+
+
+class ICalendarRenderer(renderers.BaseRenderer):
+    """Selects iCalendar output for the occurrence endpoints (``.ics`` suffix, ``?format=ics``
+    or ``Accept: text/calendar``).
+
+    Successful responses are streamed by the view itself; this renders the remaining
+    cases, error responses being returned as JSON.
+    """
+
+    media_type = "text/calendar"
+    format = "ics"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None and response.status_code >= 400:
+            response["Content-Type"] = "application/json"
+            return json.dumps(data).encode()
+        return "".join(stream_ical(data or [])).encode(self.charset)
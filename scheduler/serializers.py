@@ -1,6 +1,11 @@
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Schedule
+from .models import Job, Schedule
 
 
 class ScheduleSerializer(serializers.ModelSerializer):
@@ -23,3 +28,60 @@ class ScheduleSerializer(serializers.ModelSerializer):
                     raise serializers.ValidationError("Each time slot must contain 'start', 'stop', and 'ids' fields.")
 
         return value
+
+
+class BulkImportSerializer(serializers.Serializer):
+    """Schedules to create in a background job; each item is a create request body, validated by the job."""
+
+    schedules = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_schedules(self, value):
+        if len(value) > settings.BULK_IMPORT_MAX_SCHEDULES:
+            raise serializers.ValidationError(f"At most {settings.BULK_IMPORT_MAX_SCHEDULES} schedules per import.")
+        return value
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "attempts",
+            "max_attempts",
+            "result",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class OccurrenceQuerySerializer(serializers.Serializer):
+    """Query parameters of the occurrence endpoints: ``from``/``to`` dates (inclusive) and an IANA ``tz``."""
+
+    to = serializers.DateField(required=False)
+    tz = serializers.CharField(required=False, default="UTC")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)  # "from" can't be a class attribute
+        return fields
+
+    def validate_tz(self, value):
+        try:
+            return ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError) as exc:
+            raise serializers.ValidationError(f"Unknown time zone: {value}") from exc
+
+    def validate(self, attrs):
+        tz = attrs["tz"]
+        start = attrs.get("from") or timezone.now().astimezone(tz).date()
+        end = attrs.get("to") or start + timedelta(days=6)
+        if end < start:
+            raise serializers.ValidationError({"to": "Must not be before 'from'."})
+        if (end - start).days >= settings.OCCURRENCES_MAX_DAYS:
+            raise serializers.ValidationError({"to": f"Range is limited to {settings.OCCURRENCES_MAX_DAYS} days."})
+        return {"start": start, "end": end, "tz": tz}
@@ -0,0 +1,102 @@
+import hashlib
+import json
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .occurrences import DAYS_OF_WEEK, parse_time
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def slot_minutes(slot: dict[str, Any]) -> int:
+    """Booked minutes of a time slot; overnight slots run into the next day, unparseable ones count 0."""
+    try:
+        start, start_offset = parse_time(slot["start"])
+        stop, stop_offset = parse_time(slot["stop"])
+    except (KeyError, TypeError, ValueError):
+        return 0
+    if start_offset:
+        return 0
+    begin = start.hour * 60 + start.minute
+    end = stop.hour * 60 + stop.minute + stop_offset * MINUTES_PER_DAY
+    if end <= begin:
+        end += MINUTES_PER_DAY
+    return end - begin
+
+
+def resource_key(resource_id: Any) -> str:
+    # JSON keeps 1 and "1" apart
+    return json.dumps(resource_id, sort_keys=True)
+
+
+def resource_digest(key: str) -> str:
+    """Fixed-length stand-in for a resource key, so ids of any length can be indexed."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+@dataclass
+class Usage:
+    """Booked minutes and slots per weekday (0 is Monday) and slots per resource id.
+
+    Usages add and subtract like counters, so the change made by an update is
+    ``summarize(new) - summarize(old)`` and only its non-zero entries need writing.
+    """
+
+    minutes: Counter[int] = field(default_factory=Counter)
+    slots: Counter[int] = field(default_factory=Counter)
+    resources: Counter[str] = field(default_factory=Counter)
+
+    def __add__(self, other: "Usage") -> "Usage":
+        return self._combine(other, 1)
+
+    def __sub__(self, other: "Usage") -> "Usage":
+        return self._combine(other, -1)
+
+    def __iadd__(self, other: "Usage") -> "Usage":
+        # In place, unlike +: no copy of the running total per addition. May leave zero entries.
+        for name in ("minutes", "slots", "resources"):
+            getattr(self, name).update(getattr(other, name))
+        return self
+
+    def __neg__(self) -> "Usage":
+        return Usage() - self
+
+    def __bool__(self) -> bool:
+        return bool(self.minutes or self.slots or self.resources)
+
+    def _combine(self, other: "Usage", sign: int) -> "Usage":
+        result = Usage()
+        for name in ("minutes", "slots", "resources"):
+            counter = Counter(getattr(self, name))
+            for key, value in getattr(other, name).items():
+                counter[key] += sign * value
+            setattr(result, name, Counter({key: value for key, value in counter.items() if value}))
+        return result
+
+
+def summarize(schedule: Any) -> Usage:
+    usage = Usage()
+    if not isinstance(schedule, dict):
+        return usage
+    for day, slots in schedule.items():
+        if day not in DAYS_OF_WEEK or not isinstance(slots, list):
+            continue
+        weekday = DAYS_OF_WEEK.index(day)
+        for slot in slots:
+            if not isinstance(slot, dict):
+                continue
+            usage.slots[weekday] += 1
+            usage.minutes[weekday] += slot_minutes(slot)
+            ids = slot.get("ids")
+            for resource_id in ids if isinstance(ids, list) else ():
+                usage.resources[resource_key(resource_id)] += 1
+    return usage - Usage()  # drops zero entries
+
+
+def summarize_all(schedules: Iterable[Any]) -> Usage:
+    total = Usage()
+    for schedule in schedules:
+        total += summarize(schedule)
+    return total - Usage()  # drops zero entries
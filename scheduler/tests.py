@@ -1,16 +1,51 @@
+import gzip
+import json
 import secrets
 import string
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
 from typing import Any
+from unittest import mock
+from zoneinfo import ZoneInfo
 
+from benchmarks import import_time
+from django.conf import settings
+from django.contrib.admin.models import DELETION, LogEntry
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
+from scheduler_app import database, load_shedding, openapi, pagination, server, throttling, warmup
+from scheduler_app.load_shedding import AdaptiveLimiter, Priority, get_limiter, reset_limiter, thread_limits
 
-from .models import Schedule
+from . import jobs
+from .models import (
+    DayUsage,
+    Job,
+    ResourceUsage,
+    Schedule,
+    delete_schedules,
+    recent_readers,
+    record_read,
+    record_usage,
+    schedule_version,
+)
+from .occurrences import compile_template, expand
 from .serializers import ScheduleSerializer
+from .singleflight import SingleFlight
+from .stats import resource_key, summarize, summarize_all
+from .views import ScheduleViewSet
 
 
 # Helper function to generate a random password
@@ -213,3 +248,941 @@ class ScheduleAPITestCase(TestCase):
         serializer = ScheduleSerializer(data={"schedule": invalid_schedule})
         self.assertFalse(serializer.is_valid())
         self.assertIn("Invalid day", str(serializer.errors))
+
+
+class DatabaseSettingsTestCase(TestCase):
+    def test_sqlite_connection_is_tuned(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite-specific pragmas")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_connections_are_persistent(self):
+        self.assertGreater(settings.DATABASES["default"]["CONN_MAX_AGE"], 0)
+        self.assertTrue(settings.DATABASES["default"]["CONN_HEALTH_CHECKS"])
+
+    def test_postgres_without_psycopg_pool_keeps_persistent_connections(self):
+        config = {"ENGINE": "django.db.backends.postgresql", "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True}
+        with mock.patch.object(database, "psycopg_pool_available", return_value=False):
+            database.configure_database(config)
+        self.assertNotIn("pool", config["OPTIONS"])
+        self.assertEqual(config["CONN_MAX_AGE"], 600)
+
+
+class OpenAPISchemaTestCase(TestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(OPENAPI_SCHEMA_DIR=Path(self.schema_dir.name))
+        self.settings_override.enable()
+        openapi.clear_schema_cache()
+
+    def tearDown(self):
+        openapi.clear_schema_cache()
+        self.settings_override.disable()
+        self.schema_dir.cleanup()
+
+    def test_schema_served_with_etag(self):
+        response = self.client.get(reverse("schema-json", kwargs={"format": ".json"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("/scheduler/schedules/", json.loads(response.content)["paths"])
+        self.assertIn("ETag", response)
+
+        response = self.client.get(
+            reverse("schema-json", kwargs={"format": ".json"}), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_served_gzipped(self):
+        response = self.client.get(reverse("schema-json", kwargs={"format": ".yaml"}), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"swagger:", gzip.decompress(response.content))
+
+    def test_schema_generated_once(self):
+        with mock.patch.object(openapi, "generate_schema", wraps=openapi.generate_schema) as generate:
+            for _ in range(3):
+                self.client.get(reverse("schema-json", kwargs={"format": ".json"}))
+        self.assertEqual(generate.call_count, 1)
+
+    def test_generate_openapi_command_output_is_served(self):
+        call_command("generate_openapi", stdout=mock.Mock())
+        written = (Path(self.schema_dir.name) / "schema.json").read_bytes()
+        with mock.patch.object(openapi, "generate_schema") as generate:
+            response = self.client.get(reverse("schema-json", kwargs={"format": ".json"}))
+        generate.assert_not_called()
+        self.assertEqual(response.content, written)
+
+    def test_urlconf_loaded_before_documentation_applied(self):
+        # In a fresh process the views, and so their overrides, are only registered once
+        # the URLconf is imported
+        order = []
+        resolver = mock.Mock()
+        type(resolver).url_patterns = mock.PropertyMock(side_effect=lambda: order.append("urlconf") or [])
+        with (
+            mock.patch.object(openapi, "get_resolver", return_value=resolver),
+            mock.patch.object(openapi, "apply_documentation", side_effect=lambda: order.append("documentation")),
+            mock.patch.object(openapi.OpenAPISchemaGenerator, "get_schema"),
+        ):
+            openapi.generate_schema()
+        self.assertEqual(order, ["urlconf", "documentation"])
+
+    @override_settings(API_DOCS_ENABLED=False)
+    def test_generate_openapi_skipped_without_docs(self):
+        call_command("generate_openapi", stdout=mock.Mock())
+        self.assertEqual(list(Path(self.schema_dir.name).iterdir()), [])
+
+
+class ColdStartTestCase(TestCase):
+    def test_docs_stack_not_imported_when_disabled(self):
+        records = import_time.measure_cold_start({"API_DOCS_ENABLED": "0"})
+        modules = {record.module.strip() for record in records}
+        self.assertIn("scheduler.views", modules)
+        self.assertFalse([module for module in modules if module.startswith("drf_yasg")])
+        self.assertLess(import_time.total_ms(records), import_time.BUDGET_MS)
+
+
+class ServerTestCase(TestCase):
+    def test_workers_sized_from_cpus(self):
+        with mock.patch.dict("os.environ", {}, clear=True), mock.patch.object(server, "available_cpus", return_value=4):
+            self.assertEqual(server.default_workers(), 9)
+        with mock.patch.dict("os.environ", {"WEB_CONCURRENCY": "3"}):
+            self.assertEqual(server.default_workers(), 3)
+
+    def test_server_config(self):
+        options = server.server_options(bind="127.0.0.1:0", workers=2, threads=4, max_requests=500)
+        cfg = server.Server(server.WSGI_APPLICATION, options).cfg
+        self.assertTrue(cfg.preload_app)
+        self.assertEqual(cfg.workers, 2)
+        self.assertEqual(cfg.max_requests, 500)
+        self.assertEqual(cfg.worker_class_str, "gthread")
+        self.assertIs(cfg.post_fork, server.warm_worker)
+
+
+class OccurrenceTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+        self.schedule = Schedule.objects.create(
+            user=self.user,
+            schedule={
+                "monday": [
+                    {"start": "10:30", "stop": "12:00", "ids": [3]},
+                    {"start": "08:00", "stop": "10:00", "ids": [1]},
+                ],
+                "sunday": [{"start": "22:00", "stop": "02:00", "ids": [9]}],
+            },
+        )
+
+    def get_streamed(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_expand_orders_slots_and_handles_overnight(self):
+        template = compile_template(self.schedule.schedule)
+        occurrences = list(expand(1, template, date(2024, 1, 1), date(2024, 1, 7), ZoneInfo("UTC")))
+        self.assertEqual(
+            [o.start.isoformat() for o in occurrences][:2], ["2024-01-01T08:00:00+00:00", "2024-01-01T10:30:00+00:00"]
+        )
+        self.assertEqual(occurrences[-1].end.isoformat(), "2024-01-08T02:00:00+00:00")
+
+    def test_expand_across_dst_change(self):
+        template = compile_template({"sunday": [{"start": "08:00", "stop": "10:00", "ids": []}]})
+        occurrences = list(expand(1, template, date(2024, 3, 24), date(2024, 3, 31), ZoneInfo("Europe/Berlin")))
+        self.assertEqual(
+            [o.start.isoformat() for o in occurrences], ["2024-03-24T08:00:00+01:00", "2024-03-31T08:00:00+02:00"]
+        )
+
+    def test_expand_skipped_wall_time_moves_forward(self):
+        template = compile_template({"sunday": [{"start": "02:30", "stop": "04:00", "ids": []}]})
+        (occurrence,) = expand(1, template, date(2024, 3, 31), date(2024, 3, 31), ZoneInfo("Europe/Berlin"))
+        self.assertEqual(occurrence.start.isoformat(), "2024-03-31T03:30:00+02:00")
+
+    def test_compile_template_rejects_bad_times(self):
+        with self.assertRaises(ValueError):
+            compile_template({"monday": [{"start": "8am", "stop": "10:00", "ids": []}]})
+
+    def test_occurrences_endpoint_streams_json(self):
+        url = reverse("schedule-occurrences", args=[self.schedule.id])
+        occurrences = json.loads(
+            self.get_streamed(url, **{"from": "2024-01-01", "to": "2024-12-31", "tz": "America/New_York"})
+        )
+        self.assertEqual(len(occurrences), 53 * 2 + 52)  # 2024 has 53 Mondays and 52 Sundays
+        self.assertEqual(occurrences[0]["start"], "2024-01-01T08:00:00-05:00")
+        self.assertEqual(occurrences[0]["ids"], [1])
+
+    def test_occurrences_ics_export(self):
+        url = reverse("schedule-occurrences", kwargs={"pk": self.schedule.id, "format": "ics"})
+        calendar = self.get_streamed(url, **{"from": "2024-01-01", "to": "2024-01-07"})
+        self.assertTrue(calendar.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(calendar.count("BEGIN:VEVENT"), 3)
+        self.assertIn("DTSTART:20240101T080000Z", calendar)
+
+    def test_all_occurrences_endpoint(self):
+        Schedule.objects.create(user=self.user, schedule={"tuesday": [{"start": "09:00", "stop": "10:00", "ids": [5]}]})
+        Schedule.objects.create(user=create_test_user("otheruser"), schedule=self.schedule.schedule)
+        occurrences = json.loads(
+            self.get_streamed(reverse("schedule-all-occurrences"), **{"from": "2024-01-01", "to": "2024-01-07"})
+        )
+        self.assertEqual(len(occurrences), 4)
+
+    def test_occurrences_invalid_query(self):
+        url = reverse("schedule-occurrences", args=[self.schedule.id])
+        response = self.client.get(url, {"tz": "Mars/Olympus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {"from": "2024-01-01", "to": "2030-01-01", "format": "ics"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("to", response.json())
+
+    def test_occurrences_of_other_user(self):
+        schedule = Schedule.objects.create(user=create_test_user("otheruser"), schedule={})
+        response = self.client.get(reverse("schedule-occurrences", args=[schedule.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SingleFlightTestCase(TestCase):
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return b"payload"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do("key", compute), range(8)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({result for result, _ in results}, {b"payload"})
+        self.assertEqual(sum(shared for _, shared in results), 7)
+
+    def test_errors_are_shared_and_not_remembered(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait()
+            raise KeyError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "key", fail)
+            started.wait()
+            follower = executor.submit(flight.do, "key", lambda: "unused")
+            time.sleep(0.1)
+            release.set()
+            self.assertRaises(KeyError, leader.result)
+            self.assertRaises(KeyError, follower.result)
+        self.assertEqual(flight.do("key", lambda: "fresh"), ("fresh", False))
+
+
+class ScheduleReadCoalescingTestCase(TransactionTestCase):
+    # Not a TestCase: its per-test transaction would switch coalescing off
+
+    def setUp(self):
+        self.user = create_test_user(username="testuser")
+        self.schedule = Schedule.objects.create(user=self.user, schedule={})
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+        self.url = reverse("schedule-detail", args=[self.schedule.id])
+        self.in_flight: Future = Future()
+        self.in_flight.set_result((200, {"id": self.schedule.id}, b'{"id": "shared"}'))
+        self.key = (self.user.pk, schedule_version(self.user.pk), self.url, "application/json")
+        # Primary keys, and so cache keys, repeat across tests
+        ScheduleViewSet.read_cache.clear()
+        ScheduleViewSet.recorded_reads.clear()
+        self.addCleanup(ScheduleViewSet.read_cache.clear)
+        self.addCleanup(ScheduleViewSet.recorded_reads.clear)
+
+    def schedule_queries(self, queries):
+        return [query["sql"] for query in queries if 'FROM "scheduler_schedule"' in query["sql"]]
+
+    def test_schedule_read_joins_in_flight_call(self):
+        with mock.patch.dict(ScheduleViewSet.read_flight._calls, {self.key: self.in_flight}):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, b'{"id": "shared"}')
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_schedule_read_after_write_not_coalesced_with_earlier_flight(self):
+        with mock.patch.dict(ScheduleViewSet.read_flight._calls, {self.key: self.in_flight}):
+            self.client.delete(self.url)
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_schedule_writes_bump_version(self):
+        other = create_test_user(username="otheruser")
+        versions = [schedule_version(self.user.pk)]
+        self.schedule.schedule = {"monday": []}
+        self.schedule.save()
+        versions.append(schedule_version(self.user.pk))
+        self.schedule.user = other
+        self.schedule.save()
+        versions.append(schedule_version(self.user.pk))
+        self.assertEqual(schedule_version(other.pk), 1)
+        Schedule.objects.create(user=self.user, schedule={})
+        versions.append(schedule_version(self.user.pk))
+        delete_schedules(Schedule.objects.filter(user=self.user))
+        versions.append(schedule_version(self.user.pk))
+        self.assertEqual(versions, [1, 2, 3, 4, 5])
+
+    def test_schedule_reads_cached_until_written(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()["schedule"], {})
+        self.assertEqual(self.schedule_queries(queries), [])
+
+        self.schedule.schedule = {"monday": []}
+        self.schedule.save()
+        self.assertEqual(self.client.get(self.url).json()["schedule"], {"monday": []})
+
+    def test_preloaded_reads_match_rendered_ones(self):
+        Schedule.objects.create(user=self.user, schedule={"monday": [{"start": "08:00", "stop": "09:00", "ids": [1]}]})
+        list_url = reverse("schedule-list")
+        expected = [self.client.get(url).content for url in (list_url, self.url)]
+        ScheduleViewSet.read_cache.clear()
+
+        ScheduleViewSet.preload_reads([self.user.pk, 0], deadline=time.monotonic() + 5)
+        with CaptureQueriesContext(connection) as queries:
+            responses = [self.client.get(url) for url in (list_url, self.url)]
+        self.assertEqual([response.content for response in responses], expected)
+        self.assertEqual(self.schedule_queries(queries), [])
+
+    def test_schedule_reads_recorded_once_per_interval(self):
+        other = create_test_user(username="otheruser")
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("schedule-list"))
+        self.assertFalse([query for query in queries if "scheduler_scheduleread" in query["sql"]])
+        self.assertEqual(recent_readers(10), [self.user.pk])
+
+        record_read(other.pk)
+        self.assertEqual(recent_readers(10), [other.pk, self.user.pk])
+        with self.settings(SCHEDULE_READ_RECORD_INTERVAL=0):
+            self.client.get(self.url)
+        self.assertEqual(recent_readers(1), [self.user.pk])
+
+    def test_schedule_read_in_transaction_not_coalesced(self):
+        with mock.patch.dict(ScheduleViewSet.read_flight._calls, {self.key: self.in_flight}), transaction.atomic():
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.schedule.id)
+
+
+class LoadSheddingTestCase(TestCase):
+    def wait_for_queue(self, limiter, size):
+        deadline = time.monotonic() + 2
+        while limiter.stats()["queued"] < size and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_queued_requests_admitted_by_priority(self):
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        self.assertTrue(limiter.acquire(Priority.NORMAL, timeout=0))
+        admitted = []
+
+        def request(priority):
+            if limiter.acquire(priority, timeout=2):
+                admitted.append(priority)
+                limiter.release(0.01)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(request, Priority.LOW)
+            self.wait_for_queue(limiter, 1)
+            executor.submit(request, Priority.HIGH)
+            self.wait_for_queue(limiter, 2)
+            limiter.release(0.01)
+        self.assertEqual(admitted, [Priority.HIGH, Priority.LOW])
+
+    def test_full_queue_evicts_lower_priority(self):
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_queue=1)
+        self.assertTrue(limiter.acquire(Priority.NORMAL, timeout=0))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            low = executor.submit(limiter.acquire, Priority.LOW, 2)
+            self.wait_for_queue(limiter, 1)
+            self.assertFalse(limiter.acquire(Priority.LOW, timeout=0))  # queue full, no one to evict
+            self.assertFalse(limiter.acquire(Priority.HIGH, timeout=0.05))  # evicts LOW, then times out
+            self.assertFalse(low.result())
+        self.assertEqual(limiter.stats()["shed"], {"critical": 0, "high": 1, "normal": 0, "low": 2})
+
+    def test_low_priority_limited_to_its_capacity(self):
+        limiter = AdaptiveLimiter(initial_limit=4, capacity={Priority.LOW: 0.5})
+        self.assertTrue(limiter.acquire(Priority.LOW, timeout=0))
+        self.assertTrue(limiter.acquire(Priority.LOW, timeout=0))
+        self.assertFalse(limiter.acquire(Priority.LOW, timeout=0))
+        self.assertTrue(limiter.acquire(Priority.HIGH, timeout=0))
+
+    def test_limit_adapts_to_latency(self):
+        limiter = AdaptiveLimiter(initial_limit=10, min_limit=2)
+        for _ in range(10):
+            limiter.acquire(Priority.NORMAL, timeout=0)
+        for _ in range(10):
+            limiter.release(0.01)
+            limiter.acquire(Priority.NORMAL, timeout=0)
+        self.assertGreater(limiter.limit, 10)  # saturated and fast: probe upwards
+
+        limiter.release(1.0)
+        self.assertLess(limiter.limit, 10)  # latency far above baseline: back off
+
+    def test_gthread_worker_limit_leaves_threads_to_queue(self):
+        self.assertEqual(
+            thread_limits(8, queue_share=0.25, min_limit=2),
+            {"initial_limit": 6, "min_limit": 2, "max_limit": 6, "max_queue": 6},
+        )
+        self.assertEqual(
+            thread_limits(2, queue_share=0.25, min_limit=2),
+            {"initial_limit": 1, "min_limit": 1, "max_limit": 1, "max_queue": 1},
+        )
+
+        worker = mock.Mock()
+        worker.cfg.threads = 4
+        self.addCleanup(load_shedding.set_worker_threads, None)
+        with mock.patch.object(warmup, "warm_up_worker"):
+            server.warm_worker(None, worker)
+        limiter = get_limiter()
+        self.assertEqual(limiter.limit, 3)
+        # Of the worker's four concurrent requests, the last one queues instead of running
+        for _ in range(3):
+            self.assertTrue(limiter.acquire(Priority.CRITICAL, timeout=0))
+        self.assertFalse(limiter.acquire(Priority.CRITICAL, timeout=0.01))
+
+    def test_overloaded_request_gets_fast_503(self):
+        config = {**settings.LOAD_SHEDDING, "INITIAL_LIMIT": 1, "MIN_LIMIT": 1, "MAX_WAIT": 0.01}
+        with override_settings(LOAD_SHEDDING=config):
+            reset_limiter()
+            self.addCleanup(reset_limiter)
+            limiter = get_limiter()
+            limiter.acquire(Priority.CRITICAL, timeout=0)
+            response = self.client.get(reverse("schedule-list"))
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response["Retry-After"], "1")
+
+            token = secrets.token_hex()
+            with self.settings(METRICS_TOKEN=token):
+                metrics = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION=f"Bearer {token}").content.decode()
+            self.assertIn('scheduler_requests_shed_total{priority="high"} 1', metrics)
+
+    def test_streamed_response_holds_slot_until_closed(self):
+        user = create_test_user(username="testuser")
+        schedule = Schedule.objects.create(user=user, schedule={"monday": [{"start": "08:00", "stop": "10:00"}]})
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(user)["access"])
+        reset_limiter()
+        self.addCleanup(reset_limiter)
+
+        url = reverse("schedule-occurrences", args=[schedule.id])
+        response = client.get(url, {"from": "2024-01-01", "to": "2024-01-31"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(get_limiter().stats()["in_flight"], 1)
+        b"".join(response.streaming_content)  # the test client closes the response once consumed
+        self.assertEqual(get_limiter().stats()["in_flight"], 0)
+        response.close()
+        self.assertEqual(get_limiter().stats()["in_flight"], 0)
+
+    def test_metrics_restricted(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+        token = secrets.token_hex()
+        with self.settings(METRICS_TOKEN=token):
+            response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION=f"Bearer {token}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_200_OK)
+
+
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        throttling.reset_buckets()
+        self.addCleanup(throttling.reset_buckets)
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+
+    def throttle_rates(self, **rates):
+        return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates})
+
+    def test_token_bucket_refills(self):
+        self.assertEqual(throttling.take_token("scope", "a", "2/min", now=0), 0)
+        self.assertEqual(throttling.take_token("scope", "a", "2/min", now=0), 0)
+        self.assertAlmostEqual(throttling.take_token("scope", "a", "2/min", now=0), 30)
+        self.assertEqual(throttling.take_token("scope", "b", "2/min", now=0), 0)  # separate bucket
+        self.assertEqual(throttling.take_token("scope", "a", "2/min", now=30), 0)
+
+    def test_rates_are_per_action(self):
+        schedule = Schedule.objects.create(user=self.user, schedule={})
+        with self.throttle_rates(**{"user:schedules.list": "2/min", "user:schedules": "100/min"}):
+            for _ in range(2):
+                self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_200_OK)
+            response = self.client.get(reverse("schedule-list"))
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn("Retry-After", response)
+            response = self.client.get(reverse("schedule-detail", args=[schedule.id]))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_buckets_are_per_user(self):
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(create_test_user("otheruser"))["access"])
+        with self.throttle_rates(**{"user:schedules": "1/min"}):
+            self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(other.get(reverse("schedule-list")).status_code, status.HTTP_200_OK)
+
+    def test_signup_throttled_per_ip(self):
+        self.client.credentials()
+        with self.throttle_rates(**{"ip:auth.signup": "1/hour"}):
+            data = {"username": "newuser", "email": "newuser@example.com", "password": generate_random_password()}
+            self.assertEqual(self.client.post(reverse("signup"), data, format="json").status_code, 201)
+            data = {"username": "newuser2", "email": "newuser2@example.com", "password": generate_random_password()}
+            response = self.client.post(reverse("signup"), data, format="json", REMOTE_ADDR="127.0.0.1")
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            response = self.client.post(reverse("signup"), data, format="json", REMOTE_ADDR="10.0.0.2")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_local_buckets_evict_least_recently_used(self):
+        with mock.patch.object(throttling, "MAX_LOCAL_BUCKETS", 2):
+            for ident in ("a", "b", "a", "c"):
+                throttling.take_token("scope", ident, "2/min", now=0)
+        self.assertEqual(list(throttling._buckets), [("scope", "a"), ("scope", "c")])
+
+    def test_forwarded_for_ignored_without_trusted_proxies(self):
+        self.client.credentials()
+        with self.throttle_rates(**{"ip:auth.signup": "1/hour"}):
+            for n, expected in enumerate([status.HTTP_201_CREATED, status.HTTP_429_TOO_MANY_REQUESTS]):
+                data = {"username": f"user{n}", "email": f"user{n}@example.com", "password": generate_random_password()}
+                response = self.client.post(reverse("signup"), data, format="json", HTTP_X_FORWARDED_FOR=f"10.0.0.{n}")
+                self.assertEqual(response.status_code, expected)
+
+    def test_throttle_kind_must_identify_requests(self):
+        self.assertRaises(TypeError, throttling.TokenBucketThrottle)
+
+    @override_settings(THROTTLE_CACHE="default")
+    def test_shared_cache_backend(self):
+        self.addCleanup(cache.clear)
+        with self.throttle_rates(**{"user:schedules": "1/min"}):
+            self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(throttling._buckets, {})
+
+
+@override_settings(JOB_RETRY_DELAY=0)
+class JobQueueTestCase(TestCase):
+    def setUp(self):
+        throttling.reset_buckets()
+        self.addCleanup(throttling.reset_buckets)
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+
+    def test_bulk_import(self):
+        items = [{"schedule": {"monday": [{"start": "08:00", "stop": "10:00", "ids": [n]}]}} for n in range(3)]
+        items.insert(1, {"schedule": {"funday": []}})
+        response = self.client.post(reverse("schedule-bulk-import"), {"schedules": items}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "queued")
+        self.assertFalse(Schedule.objects.exists())
+
+        with mock.patch.object(jobs, "BATCH_SIZE", 2):
+            self.assertEqual(jobs.work("test", burst=True), 1)
+
+        job = self.client.get(response["Location"]).data
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["progress"], 1.0)
+        self.assertEqual(job["result"]["created"], 3)
+        self.assertEqual(job["result"]["errors"][0]["index"], 1)
+        self.assertEqual(Schedule.objects.filter(user=self.user).count(), 3)
+
+    def test_bulk_import_rejects_bad_payload(self):
+        response = self.client.post(reverse("schedule-bulk-import"), {"schedules": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_jobs_of_other_users_are_hidden(self):
+        job = jobs.enqueue("bulk_import", {"schedules": []}, user=create_test_user("otheruser"))
+        response = self.client.get(reverse("job-detail", args=[job.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse("job-list")).data, [])
+
+    def test_claim_hands_each_job_out_once(self):
+        first = jobs.enqueue("bulk_import", {"schedules": []})
+        second = jobs.enqueue("bulk_import", {"schedules": []})
+        Job.objects.filter(pk=second.pk).update(run_at=timezone.now() + timedelta(minutes=1))
+
+        for skip_locked in (False, True):
+            with self.subTest(skip_locked=skip_locked):
+                Job.objects.filter(pk=first.pk).update(status=Job.Status.QUEUED)
+                with mock.patch.object(connection.features, "has_select_for_update_skip_locked", skip_locked):
+                    claimed = jobs.claim("a")
+                    self.assertEqual(claimed.pk, first.pk)
+                    self.assertEqual(claimed.status, Job.Status.RUNNING)
+                    self.assertEqual(claimed.locked_by, "a")
+                    self.assertIsNone(jobs.claim("b"))  # the other job isn't due yet
+
+    def test_failed_job_is_retried_then_fails(self):
+        calls = []
+
+        def flaky(job):
+            calls.append(job.attempts)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return {"ok": True}
+
+        with mock.patch.dict(jobs.HANDLERS, {"flaky": flaky, "broken": mock.Mock(side_effect=RuntimeError("boom"))}):
+            ok = jobs.enqueue("flaky", {})
+            broken = jobs.enqueue("broken", {})
+            with self.assertLogs("scheduler.jobs", "ERROR"):
+                jobs.work("test", burst=True)
+
+        ok.refresh_from_db()
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual((ok.status, ok.result, ok.error), (Job.Status.SUCCEEDED, {"ok": True}, ""))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (Job.Status.FAILED, settings.JOB_MAX_ATTEMPTS))
+        self.assertEqual(broken.error, "RuntimeError: boom")
+
+    def test_stale_running_job_is_requeued(self):
+        job = jobs.enqueue("bulk_import", {"schedules": []}, user=self.user)
+        jobs.claim("crashed")
+        silent_since = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT + 1)
+        Job.objects.filter(pk=job.pk).update(locked_at=silent_since)
+        self.assertEqual(jobs.work("test", burst=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.SUCCEEDED, 2))
+
+    def test_account_deletion(self):
+        Schedule.objects.bulk_create(Schedule(user=self.user, schedule={}) for _ in range(5))
+        other = Schedule.objects.create(user=create_test_user("otheruser"), schedule={})
+        response = self.client.delete(reverse("account"))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotIn("Location", response)
+        self.assertEqual(self.client.get(reverse("schedule-list")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with mock.patch.object(jobs, "BATCH_SIZE", 2):
+            call_command("run_workers", "--burst", "--concurrency", "1", stdout=mock.Mock())
+
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual((job.status, job.result, job.user), (Job.Status.SUCCEEDED, {"deleted": 5}, None))
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(list(Schedule.objects.all()), [other])
+
+    def test_account_stays_active_if_deletion_not_queued(self):
+        with mock.patch.object(jobs, "enqueue", side_effect=DatabaseError), self.assertRaises(DatabaseError):
+            self.client.delete(reverse("account"))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+
+
+class UsageStatsTestCase(TestCase):
+    def setUp(self):
+        throttling.reset_buckets()
+        self.addCleanup(throttling.reset_buckets)
+        self.client = APIClient()
+        self.user = create_test_user(username="testuser")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer " + get_tokens_for_user(self.user)["access"])
+
+    def stored_usage(self, user: User) -> tuple[dict, dict]:
+        days = {day: (minutes, slots) for day, minutes, slots in user.day_usage.values_list("day", "minutes", "slots")}
+        return days, dict(user.resource_usage.values_list("resource", "slots"))
+
+    def recomputed_usage(self, user: User) -> tuple[dict, dict]:
+        usage = summarize_all(user.schedule_set.values_list("schedule", flat=True))
+        days = {day: (usage.minutes[day], usage.slots[day]) for day in usage.minutes.keys() | usage.slots.keys()}
+        return days, dict(usage.resources)
+
+    def test_summarize(self):
+        usage = summarize(
+            {
+                "monday": [
+                    {"start": "08:00", "stop": "10:30", "ids": [1, "1"]},
+                    {"start": "22:00", "stop": "02:00", "ids": [1]},
+                ],
+                "sunday": [
+                    {"start": "12:00", "stop": "24:00", "ids": []},
+                    {"start": "bad", "stop": "10:00", "ids": []},
+                ],
+            }
+        )
+        self.assertEqual(usage.minutes, {0: 150 + 240, 6: 720})
+        self.assertEqual(usage.slots, {0: 2, 6: 2})
+        self.assertEqual(usage.resources, {resource_key(1): 2, resource_key("1"): 1})
+        self.assertNotEqual(resource_key(1), resource_key("1"))
+
+    def test_summary_follows_writes(self):
+        url = reverse("schedule-list")
+        first = self.client.post(
+            url, {"schedule": {"monday": [{"start": "08:00", "stop": "10:00", "ids": [1, 2]}]}}, format="json"
+        ).data
+        second = {"schedule": {"monday": [{"start": "09:00", "stop": "10:00", "ids": [2]}]}}
+        self.client.post(url, second, format="json")
+        self.assertEqual(self.stored_usage(self.user), ({0: (180, 2)}, {resource_key(1): 1, resource_key(2): 2}))
+
+        self.client.put(
+            reverse("schedule-detail", args=[first["id"]]),
+            {"schedule": {"friday": [{"start": "10:00", "stop": "10:45", "ids": [3]}]}},
+            format="json",
+        )
+        self.assertEqual(self.stored_usage(self.user), self.recomputed_usage(self.user))
+        self.assertFalse(ResourceUsage.objects.filter(resource=resource_key(1)).exists())
+
+        self.client.delete(reverse("schedule-detail", args=[first["id"]]))
+        self.assertEqual(self.stored_usage(self.user), ({0: (60, 1), 4: (0, 0)}, {resource_key(2): 1}))
+
+        response = self.client.get(reverse("schedule-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["days"]["monday"], {"minutes": 60, "slots": 1})
+        self.assertEqual(response.data["days"]["sunday"], {"minutes": 0, "slots": 0})
+        self.assertEqual((response.data["minutes"], response.data["slots"], response.data["resources"]), (60, 1, 1))
+        self.assertEqual(response.data["resource_ids"], [2])
+
+    def test_summarize_all_accumulates_in_place(self):
+        schedules = [{"monday": [{"start": "08:00", "stop": "09:00", "ids": [n % 3]}]} for n in range(6)]
+        total = summarize_all(schedules)
+        self.assertEqual((total.minutes, total.slots), ({0: 360}, {0: 6}))
+        self.assertEqual(total.resources, {resource_key(0): 2, resource_key(1): 2, resource_key(2): 2})
+        usage = summarize(schedules[0])
+        running = usage
+        running += summarize(schedules[1])
+        self.assertIs(running, usage)
+
+    def test_long_resource_ids(self):
+        long_id = "r" * 1000
+        Schedule.objects.create(
+            user=self.user, schedule={"monday": [{"start": "08:00", "stop": "09:00", "ids": [long_id]}]}
+        )
+        self.assertEqual(self.stored_usage(self.user)[1], {resource_key(long_id): 1})
+
+    def test_update_only_touches_changed_rows(self):
+        schedule = Schedule.objects.create(
+            user=self.user,
+            schedule={
+                "monday": [{"start": "08:00", "stop": "10:00", "ids": [1]}],
+                "tuesday": [{"start": "08:00", "stop": "09:00", "ids": [2]}],
+            },
+        )
+        schedule.schedule["tuesday"][0]["stop"] = "09:30"
+        with CaptureQueriesContext(connection) as queries:
+            schedule.save()
+        statements = [query["sql"] for query in queries if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        # Read the stored JSON, write the new one, a single increment for Tuesday, then
+        # the owner's write version
+        self.assertEqual(len(statements), 4, statements)
+        self.assertEqual(
+            self.stored_usage(self.user), ({0: (120, 1), 1: (90, 1)}, {resource_key(1): 1, resource_key(2): 1})
+        )
+
+    def test_moving_a_schedule_to_another_user(self):
+        other = create_test_user("otheruser")
+        schedule = Schedule.objects.create(
+            user=self.user, schedule={"monday": [{"start": "08:00", "stop": "09:00", "ids": [1]}]}
+        )
+        schedule.user = other
+        schedule.save()
+        self.assertEqual(self.stored_usage(self.user), ({0: (0, 0)}, {}))
+        self.assertEqual(self.stored_usage(other), ({0: (60, 1)}, {resource_key(1): 1}))
+
+    def test_bulk_import_and_recompute_jobs(self):
+        items = [{"schedule": {"sunday": [{"start": "08:00", "stop": "09:00", "ids": [n % 2]}]}} for n in range(5)]
+        self.client.post(reverse("schedule-bulk-import"), {"schedules": items}, format="json")
+        jobs.work("test", burst=True)
+        self.assertEqual(self.stored_usage(self.user), ({6: (300, 5)}, {resource_key(0): 3, resource_key(1): 2}))
+
+        # Drift from writes that bypass Schedule.save is repaired by a rebuild
+        Schedule.objects.filter(user=self.user).update(schedule={})
+        record_usage(self.user.id, -summarize({"sunday": [{"start": "08:00", "stop": "08:30", "ids": [7]}]}))
+        jobs.enqueue("recompute_usage", {"user": self.user.id})
+        jobs.work("test", burst=True)
+        self.assertEqual(self.stored_usage(self.user), ({}, {}))
+        self.assertFalse(DayUsage.objects.exists())
+
+
+class ScheduleAdminTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", generate_random_password())
+        self.client.force_login(self.admin)
+        self.owners = [create_test_user(f"owner{n}") for n in range(3)]
+        self.schedules = Schedule.objects.bulk_create(
+            Schedule(user=owner, schedule={"monday": [{"start": "08:00", "stop": "09:00", "ids": [n]}]})
+            for owner in self.owners
+            for n in range(4)
+        )
+        for owner in self.owners:
+            jobs.recompute_usage(Job(payload={"user": owner.pk}))
+
+    def test_changelist_skips_json_counts_and_per_row_users(self):
+        url = reverse("admin:scheduler_schedule_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        listing = [query["sql"] for query in queries if '"scheduler_schedule"' in query["sql"]]
+        # One count for the paginator and one joined page query, without the JSON column
+        self.assertEqual(len(listing), 2, listing)
+        self.assertIn("INNER JOIN", listing[-1])
+        self.assertNotIn('"scheduler_schedule"."schedule"', listing[-1])
+
+    def test_unfiltered_count_uses_estimate(self):
+        queryset = Schedule.objects.order_by("pk")
+        with mock.patch.object(pagination, "estimated_row_count", return_value=2_000_000):
+            self.assertEqual(pagination.EstimatedCountPaginator(queryset, 50).count, 2_000_000)
+            self.assertEqual(pagination.EstimatedCountPaginator(queryset.filter(user=self.owners[0]), 50).count, 4)
+        self.assertIsNone(pagination.estimated_row_count(Schedule))  # SQLite has no statistics
+        self.assertEqual(pagination.EstimatedCountPaginator(queryset, 50).count, 12)
+
+    def test_search_is_exact(self):
+        url = reverse("admin:scheduler_schedule_changelist")
+        response = self.client.get(url, {"q": "owner1"})
+        self.assertEqual({schedule.user for schedule in response.context["cl"].result_list}, {self.owners[1]})
+        response = self.client.get(url, {"q": "owner"})
+        self.assertEqual(list(response.context["cl"].result_list), [])
+        response = self.client.get(url, {"q": str(self.schedules[0].pk)})
+        self.assertEqual(list(response.context["cl"].result_list), [self.schedules[0]])
+
+    def test_bulk_delete_is_batched_and_keeps_usage(self):
+        url = reverse("admin:scheduler_schedule_changelist")
+        selected = [str(schedule.pk) for schedule in self.schedules[:6]]
+        data = {"action": "delete_selected", "_selected_action": selected}
+        response = self.client.post(url, data)
+        self.assertContains(response, str(self.schedules[0]))
+
+        with (
+            mock.patch("scheduler.admin.delete_schedules", wraps=delete_schedules) as deleted,
+            mock.patch("scheduler.admin.DELETE_BATCH_SIZE", 4),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            self.client.post(url, {**data, "post": "yes"})
+        deleted.assert_called_once()
+        self.assertEqual(Schedule.objects.count(), 6)
+        self.assertEqual(LogEntry.objects.filter(action_flag=DELETION).count(), 6)
+        self.assertEqual(sum(query["sql"].startswith('INSERT INTO "django_admin_log"') for query in queries), 2)
+        # Every read of the selection is bounded: no len(queryset) over all selected rows
+        reads = [q["sql"] for q in queries if q["sql"].startswith("SELECT") and 'FROM "scheduler_schedule"' in q["sql"]]
+        self.assertTrue(all("LIMIT" in sql or "COUNT(" in sql for sql in reads), reads)
+        self.assertEqual(self.owners[0].day_usage.get().slots, 0)
+        self.assertEqual(self.owners[1].day_usage.get().slots, 2)
+        self.assertEqual(self.owners[2].day_usage.get().slots, 4)
+        self.assertEqual(
+            set(self.owners[1].resource_usage.values_list("resource", flat=True)), {resource_key(2), resource_key(3)}
+        )
+
+    def test_delete_schedules_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(delete_schedules(Schedule.objects.filter(user__in=self.owners[:2]), batch_size=3), 8)
+        self.assertEqual(sum(query["sql"].startswith('DELETE FROM "scheduler_schedule"') for query in queries), 3)
+        self.assertFalse(ResourceUsage.objects.filter(user__in=self.owners[:2]).exists())
+
+    def test_recompute_action_queues_jobs(self):
+        url = reverse("admin:scheduler_schedule_changelist")
+        selected = [str(schedule.pk) for schedule in self.schedules[:5]]
+        self.client.post(url, {"action": "recompute_owner_usage", "_selected_action": selected})
+        self.assertEqual(
+            sorted(Job.objects.filter(kind="recompute_usage").values_list("payload__user", flat=True)),
+            [self.owners[0].pk, self.owners[1].pk],
+        )
+
+    def test_job_kind_filter_is_indexed(self):
+        response = self.client.get(reverse("admin:scheduler_job_changelist"), {"kind": "recompute_usage"})
+        self.assertEqual(response.status_code, 200)
+        plan = Job.objects.filter(kind="recompute_usage").order_by("-id").explain()
+        self.assertIn("scheduler_job_kind_idx", plan)
+
+
+class WarmupTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(warmup, "state", warmup.WarmupState())
+        self.state = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_warm_up_runs_configured_tasks(self):
+        snapshot = warmup.warm_up()
+        self.assertEqual(snapshot["status"], "ready")
+        self.assertEqual({result["status"] for result in snapshot["tasks"].values()}, {"done"})
+        self.assertEqual(list(snapshot["tasks"]), settings.WARMUP["TASKS"])
+
+    def test_budget_and_failures_dont_block_readiness(self):
+        with (
+            mock.patch.dict(warmup.TASKS, {"jwt": mock.Mock(side_effect=RuntimeError("no key"))}),
+            self.assertLogs("scheduler_app.warmup", "ERROR"),
+        ):
+            snapshot = warmup.warm_up(["jwt", "validators"])
+        self.assertEqual(snapshot["tasks"]["jwt"]["status"], "failed")
+        self.assertEqual(snapshot["tasks"]["validators"]["status"], "done")
+
+        snapshot = warmup.warm_up(["schema", "validators"], budget=0)
+        self.assertEqual([snapshot["tasks"][name]["status"] for name in ("schema", "validators")], ["skipped"] * 2)
+        self.assertEqual(snapshot["status"], "ready")
+
+    def test_worker_runs_what_the_master_did_not(self):
+        warmup.warm_up_shared()
+        self.assertEqual(self.state.status, "cold")
+        self.assertEqual(set(self.state.tasks), {"schema", "jwt", "validators"})
+        with mock.patch.object(warmup, "warm_up", wraps=warmup.warm_up) as warm_up:
+            warmup.warm_up_worker()
+        warm_up.assert_called_once_with(["database", "schedules"])
+        self.assertEqual(self.state.status, "ready")
+
+    def test_worker_retries_what_the_master_skipped_or_failed(self):
+        with (
+            mock.patch.dict(warmup.TASKS, {"jwt": mock.Mock(side_effect=RuntimeError("no key"))}),
+            self.assertLogs("scheduler_app.warmup", "ERROR"),
+        ):
+            warmup.warm_up(["jwt"], finish=False)
+        warmup.warm_up(["schema"], budget=0, finish=False)
+        with mock.patch.object(warmup, "warm_up", wraps=warmup.warm_up) as warm_up:
+            warmup.warm_up_worker()
+        warm_up.assert_called_once_with(["schema", "jwt", "validators", "database", "schedules"])
+        self.assertEqual({result["status"] for result in self.state.tasks.values()}, {"done"})
+
+    def test_database_warmed_where_requests_use_it(self):
+        with mock.patch.object(warmup, "connection", mock.Mock(spec=["ensure_connection"])) as connection_:
+            warmup.warm_up_worker()
+            connection_.ensure_connection.assert_not_called()
+            self.state.serving_thread = True
+            warmup.warm_database(time.monotonic() + 5)
+            connection_.ensure_connection.assert_called_once()
+
+        with mock.patch.object(warmup, "connection") as connection_:
+            warmup.warm_database(time.monotonic() + 5)
+        connection_.pool.open.assert_called_once_with(wait=True, timeout=mock.ANY)
+        connection_.ensure_connection.assert_not_called()
+
+    def test_gthread_worker_warms_up_off_the_serving_threads(self):
+        worker = mock.Mock()
+        worker.cfg.threads = 4
+        self.addCleanup(load_shedding.set_worker_threads, None)
+        with (
+            mock.patch.object(warmup, "warm_up_worker") as warm_up_worker,
+            mock.patch.object(server, "connections") as connections_,
+        ):
+            server.warm_worker(None, worker)
+        warm_up_worker.assert_called_once_with(serving_thread=False)
+        connections_.close_all.assert_called_once()
+
+    def test_schedules_of_latest_readers_preloaded(self):
+        user = create_test_user(username="testuser")
+        record_read(user.pk)
+        with mock.patch.object(ScheduleViewSet, "preload_reads") as preload_reads:
+            snapshot = warmup.warm_up(["schedules"])
+        self.assertEqual(snapshot["tasks"]["schedules"]["status"], "done")
+        preload_reads.assert_called_once_with([user.pk], mock.ANY)
+
+    def test_readiness_endpoint(self):
+        with mock.patch.object(warmup.threading, "Thread") as thread:
+            response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "warming")
+        thread.return_value.start.assert_called_once()
+
+        warmup.warm_up_worker()
+        response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["tasks"]), set(settings.WARMUP["TASKS"]))
+
+        self.state.status = "cold"
+        with override_settings(WARMUP={**settings.WARMUP, "ENABLED": False}):
+            self.assertEqual(self.client.get(reverse("ready")).status_code, 200)
@@ -1,10 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import ScheduleViewSet
+from .views import JobViewSet, ScheduleViewSet
 
 router = DefaultRouter()
 router.register(r"schedules", ScheduleViewSet)
+router.register(r"jobs", JobViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,19 +1,53 @@
-from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
-from rest_framework import viewsets
+import json
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from scheduler_app.docs import document
 
-from .models import Schedule
+from . import jobs
+from .models import DayUsage, Job, ResourceUsage, Schedule, record_read, schedule_version
+from .occurrences import DAYS_OF_WEEK, Occurrence, compile_template, expand, stream_ical, stream_json
 from .permissions import IsOwner  # Import the custom permission
-from .serializers import ScheduleSerializer
+from .readcache import ReadCache
+from .renderers import ICalendarRenderer
+from .serializers import BulkImportSerializer, JobSerializer, OccurrenceQuerySerializer, ScheduleSerializer
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Users whose last read recording each process remembers
+RECORDED_READERS = 10_000
+
+
+def job_accepted(request: Request, job: Job) -> Response:
+    """202 response for work handed to the job queue, pointing at the job's status endpoint."""
+    location = reverse("job-detail", kwargs={"pk": job.pk}, request=request)
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers={"Location": location})
 
 
 class ScheduleViewSet(viewsets.ModelViewSet):
     queryset = Schedule.objects.all()
     serializer_class = ScheduleSerializer
     permission_classes = [IsAuthenticated, IsOwner]  # Require authentication and ownership
+    throttle_scope = "schedules"
 
     def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation runs without a request user
+            return Schedule.objects.none()
         # Return only schedules that belong to the authenticated user
         return Schedule.objects.filter(user=self.request.user)
 
@@ -21,143 +55,215 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         # Automatically assign the logged-in user as the owner when creating a schedule
         serializer.save(user=self.request.user)
 
+    # Concurrent identical reads (same user, URL and media type) share one query and render,
+    # unless a write to the user's schedules committed between their arrivals
+    read_flight = SingleFlight()
+    # This process's rendered reads under the same keys, filled by reads and by the warm-up;
+    # a write bumps the version in the key, so they are never served after one
+    read_cache = ReadCache(lambda: settings.SCHEDULE_READ_CACHE_SIZE)
+    # When this process last recorded each user's reads (monotonic seconds)
+    recorded_reads = ReadCache(lambda: RECORDED_READERS)
+
+    @classmethod
+    def note_read(cls, user_id: int) -> None:
+        now = time.monotonic()
+        recorded = cls.recorded_reads.get(user_id)
+        if recorded is None or now - recorded >= settings.SCHEDULE_READ_RECORD_INTERVAL:
+            cls.recorded_reads.put(user_id, now)
+            record_read(user_id)
+
+    @classmethod
+    def preload_reads(cls, user_ids: Iterable[int], deadline: float) -> None:
+        """Cache the list and detail reads of these users' schedules, stopping at ``deadline``.
+
+        They are rendered as list() and retrieve() would for a JSON request without
+        query parameters: same queryset, serializer and renderer.
+        """
+        renderer = JSONRenderer()
+        media_type = renderer.media_type
+        list_path = reverse("schedule-list")
+        user_ids = list(user_ids)
+        users = User.objects.in_bulk(user_ids)
+        for user_id in user_ids:
+            if time.monotonic() >= deadline:
+                return
+            if user_id not in users:
+                continue
+            # Read before the schedules, as coalesced_read() does
+            version = schedule_version(user_id)
+            # The related manager hands each schedule its (already loaded) user
+            data = ScheduleSerializer(users[user_id].schedule_set.all(), many=True).data
+            cls.read_cache.put(
+                (user_id, version, list_path, media_type), (200, data, renderer.render(data, media_type))
+            )
+            for item in data:
+                path = reverse("schedule-detail", kwargs={"pk": item["id"]})
+                cls.read_cache.put((user_id, version, path, media_type), (200, item, renderer.render(item, media_type)))
+
+    def coalesced_read(self, read: Callable[[], Response]) -> Response:
+        request = self.request
+        renderer = request.accepted_renderer
+        if not settings.SCHEDULE_READ_COALESCING or not isinstance(renderer, JSONRenderer):
+            return read()
+        if transaction.get_connection().in_atomic_block:
+            # A read inside a transaction (e.g. an atomic batch) may see its own uncommitted
+            # writes, so it must neither be shared with nor served from other requests
+            return read()
+
+        def render():
+            response = read()
+            content = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            return response.status_code, response.data, content
+
+        self.note_read(request.user.pk)
+        # A read arriving after a write sees its version, so it can't join a flight that
+        # started (and may have queried) before the write committed
+        version = schedule_version(request.user.pk)
+        key = (request.user.pk, version, request.get_full_path(), request.accepted_media_type)
+        result = self.read_cache.get(key)
+        if result is None:
+            result, _ = self.read_flight.do(key, render)
+            if result[0] == status.HTTP_200_OK:
+                self.read_cache.put(key, result)
+        status_code, data, content = result
+        response = Response(data, status=status_code)
+        response.content = content  # already rendered; marks the response as rendered
+        content_type = request.accepted_media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        response["Content-Type"] = content_type
+        return response
+
     # CREATE Schedule with Swagger documentation
-    @swagger_auto_schema(
-        operation_description="Create a new schedule with time slots for each day of the week.",
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "schedule": openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    example={
-                        "monday": [
-                            {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
-                            {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
-                        ],
-                    },
-                )
-            },
-        ),
-        responses={
-            201: openapi.Response(
-                description="Schedule created successfully",
-                examples={
-                    "application/json": {
-                        "id": 1,
-                        "schedule": {
-                            "monday": [
-                                {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
-                                {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
-                            ],
-                            "tuesday": [{"start": "09:00", "stop": "11:00", "ids": [5, 6]}],
-                        },
-                    }
-                },
-            ),
-            400: openapi.Response(
-                description="Invalid input",
-                examples={"application/json": {"schedule": {"funday": ["Invalid day: funday"]}}},
-            ),
-        },
-    )
+    @document("scheduler.docs.CREATE_SCHEDULE")
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
     # LIST all schedules
-    @swagger_auto_schema(
-        operation_description="Get all schedules, with details for each day of the week.",
-        responses={
-            200: openapi.Response(
-                description="List of schedules",
-                examples={
-                    "application/json": [
-                        {
-                            "id": 1,
-                            "schedule": {
-                                "monday": [
-                                    {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
-                                    {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
-                                ]
-                            },
-                            "user": "username",  # Include user in the example response if you like
-                        }
-                    ]
-                },
-            )
-        },
-    )
+    @document("scheduler.docs.LIST_SCHEDULES")
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.coalesced_read(partial(super().list, request, *args, **kwargs))
 
     # RETRIEVE a specific schedule
-    @swagger_auto_schema(
-        operation_description="Retrieve a specific schedule by its ID.",
-        responses={
-            200: openapi.Response(
-                description="Details of the schedule",
-                examples={
-                    "application/json": {
-                        "id": 1,
-                        "schedule": {
-                            "monday": [
-                                {"start": "08:00", "stop": "10:00", "ids": [1, 2]},
-                                {"start": "10:30", "stop": "12:00", "ids": [3, 4]},
-                            ]
-                        },
-                        "user": "username",
-                    }
-                },
-            ),
-            404: openapi.Response(
-                description="Schedule not found",
-                examples={"application/json": {"detail": "Not found."}},
-            ),
-        },
-    )
+    @document("scheduler.docs.RETRIEVE_SCHEDULE")
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        return self.coalesced_read(partial(super().retrieve, request, *args, **kwargs))
 
     # UPDATE a specific schedule
-    @swagger_auto_schema(
-        operation_description="Update a specific schedule by its ID.",
-        request_body=ScheduleSerializer,
-        responses={
-            200: openapi.Response(
-                description="Schedule updated successfully",
-                examples={
-                    "application/json": {
-                        "id": 1,
-                        "schedule": {"tuesday": [{"start": "09:00", "stop": "11:00", "ids": [5, 6]}]},
-                        "user": "username",
-                    }
-                },
-            ),
-            400: openapi.Response(
-                description="Invalid input",
-                examples={"application/json": {"schedule": {"monday": ["Missing 'start' field"]}}},
-            ),
-            404: openapi.Response(
-                description="Schedule not found",
-                examples={"application/json": {"detail": "Not found."}},
-            ),
-        },
-    )
+    @document("scheduler.docs.UPDATE_SCHEDULE")
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
     # DELETE a specific schedule
-    @swagger_auto_schema(
-        operation_description="Delete a specific schedule by its ID.",
-        responses={
-            204: openapi.Response(
-                description="Schedule deleted successfully",
-                examples={"application/json": None},
-            ),
-            404: openapi.Response(
-                description="Schedule not found",
-                examples={"application/json": {"detail": "Not found."}},
-            ),
-        },
-    )
+    @document("scheduler.docs.DESTROY_SCHEDULE")
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+    # OCCURRENCES: concrete dated time slots expanded from the weekly template, streamed
+    def get_occurrence_query(self):
+        query = OccurrenceQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return query.validated_data
+
+    def stream_occurrences(self, occurrences: Iterator[Occurrence], ical: bool) -> StreamingHttpResponse:
+        if ical:
+            response = StreamingHttpResponse(
+                stream_ical(occurrences, host=self.request.get_host()), content_type="text/calendar; charset=utf-8"
+            )
+            response["Content-Disposition"] = 'attachment; filename="occurrences.ics"'
+            return response
+        return StreamingHttpResponse(stream_json(occurrences), content_type="application/json")
+
+    def schedule_occurrences(self, ical: bool) -> StreamingHttpResponse:
+        schedule = self.get_object()
+        query = self.get_occurrence_query()
+        try:
+            template = compile_template(schedule.schedule)
+        except ValueError as exc:
+            raise serializers.ValidationError({"schedule": str(exc)}) from exc
+        return self.stream_occurrences(
+            expand(schedule.id, template, query["start"], query["end"], query["tz"]), ical=ical
+        )
+
+    def all_schedule_occurrences(self, ical: bool) -> StreamingHttpResponse:
+        query = self.get_occurrence_query()
+        # Schedules are fetched in chunks and expanded one at a time, so memory stays flat
+        # however many schedules and days are requested.
+        schedules = self.get_queryset().order_by("id").only("id", "schedule").iterator(chunk_size=100)
+
+        def occurrences() -> Iterator[Occurrence]:
+            for schedule in schedules:
+                try:
+                    template = compile_template(schedule.schedule)
+                except ValueError:
+                    logger.warning("Skipping schedule %s with an invalid template", schedule.id)
+                    continue
+                yield from expand(schedule.id, template, query["start"], query["end"], query["tz"])
+
+        return self.stream_occurrences(occurrences(), ical=ical)
+
+    @document("scheduler.docs.SCHEDULE_OCCURRENCES")
+    @action(detail=True, methods=["get"], renderer_classes=[JSONRenderer, ICalendarRenderer])
+    def occurrences(self, request, pk=None, format=None):  # noqa: A002
+        return self.schedule_occurrences(ical=request.accepted_renderer.format == ICalendarRenderer.format)
+
+    @document("scheduler.docs.ALL_OCCURRENCES")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="occurrences",
+        url_name="all-occurrences",
+        renderer_classes=[JSONRenderer, ICalendarRenderer],
+    )
+    def all_occurrences(self, request, format=None):  # noqa: A002
+        return self.all_schedule_occurrences(ical=request.accepted_renderer.format == ICalendarRenderer.format)
+
+    # BULK IMPORT: validated and created by a background job, so large imports don't hold the request
+    @document("scheduler.docs.BULK_IMPORT")
+    @action(detail=False, methods=["post"], url_path="bulk_import", serializer_class=BulkImportSerializer)
+    def bulk_import(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = jobs.enqueue("bulk_import", {"schedules": serializer.validated_data["schedules"]}, user=request.user)
+        return job_accepted(request, job)
+
+    # STATS: read from the incrementally maintained summary tables, not from the schedules
+    @document("scheduler.docs.SCHEDULE_STATS")
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        days = {day: {"minutes": 0, "slots": 0} for day in DAYS_OF_WEEK}
+        resources = list(
+            ResourceUsage.objects.filter(user=request.user).order_by("resource").values_list("resource", flat=True)
+        )
+        for day, minutes, slots in DayUsage.objects.filter(user=request.user).values_list("day", "minutes", "slots"):
+            days[DAYS_OF_WEEK[day]] = {"minutes": minutes, "slots": slots}
+        return Response(
+            {
+                "days": days,
+                "minutes": sum(day["minutes"] for day in days.values()),
+                "slots": sum(day["slots"] for day in days.values()),
+                "resources": len(resources),
+                "resource_ids": [json.loads(resource) for resource in resources],
+            }
+        )
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and progress of the authenticated user's background jobs."""
+
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Job.objects.none()
+        return Job.objects.filter(user=self.request.user).order_by("-id")
+
+    @document("scheduler.docs.LIST_JOBS")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @document("scheduler.docs.RETRIEVE_JOB")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
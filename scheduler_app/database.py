@@ -0,0 +1,71 @@
+import importlib.util
+import os
+from typing import Any
+
+# SQLite pragmas applied to every new connection when the tuned mode is on.
+# WAL lets readers proceed while a writer holds the lock, NORMAL sync is safe
+# under WAL, mmap avoids read() syscalls for hot pages, and busy_timeout makes
+# writers wait for the lock instead of failing immediately with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "busy_timeout": os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "temp_store": "MEMORY",
+}
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def psycopg_pool_available() -> bool:
+    """Native pooling needs psycopg 3 plus psycopg_pool; psycopg2 has no pool integration in Django."""
+    return importlib.util.find_spec("psycopg") is not None and importlib.util.find_spec("psycopg_pool") is not None
+
+
+def sqlite_init_command(pragmas: dict[str, str] | None = None) -> str:
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    return "; ".join(f"PRAGMA {name}={value}" for name, value in pragmas.items())
+
+
+def configure_database(
+    config: dict[str, Any],
+    *,
+    pool: bool = True,
+    pool_min_size: int = 2,
+    pool_max_size: int = 10,
+    pool_timeout: float = 10.0,
+    sqlite_tuned: bool = True,
+) -> dict[str, Any]:
+    """Apply connection reuse settings for the configured backend.
+
+    ``config`` is a ``DATABASES`` entry as produced by ``dj_database_url.config``; it is
+    updated in place and returned so it can be used inline in settings.
+    """
+    engine = config.get("ENGINE", "")
+    options = config.setdefault("OPTIONS", {})
+
+    if engine.endswith("postgresql") and pool and psycopg_pool_available():
+        from psycopg_pool import ConnectionPool
+
+        options["pool"] = {
+            "min_size": pool_min_size,
+            "max_size": pool_max_size,
+            "timeout": pool_timeout,
+            "check": ConnectionPool.check_connection,
+        }
+        # Django refuses to combine its own persistent connections with a pool;
+        # the pool owns reuse and health checking instead.
+        config["CONN_MAX_AGE"] = 0
+        config["CONN_HEALTH_CHECKS"] = False
+
+    if engine.endswith("sqlite3") and sqlite_tuned:
+        options.setdefault("init_command", sqlite_init_command())
+        # Seconds the sqlite3 driver waits on a locked database, kept in line with busy_timeout.
+        options.setdefault("timeout", int(SQLITE_PRAGMAS["busy_timeout"]) / 1000)
+
+    return config
@@ -0,0 +1,38 @@
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from django.utils.module_loading import import_string
+
+ViewT = TypeVar("ViewT", bound=Callable[..., Any])
+
+# (view, dotted path to a dict of swagger_auto_schema keyword arguments)
+_deferred: list[tuple[Callable[..., Any], str]] = []
+_deferred_lock = threading.Lock()
+
+
+def document(overrides: str) -> Callable[[ViewT], ViewT]:
+    """Lazy stand-in for ``drf_yasg.utils.swagger_auto_schema``.
+
+    ``overrides`` is the dotted path of a dict holding the ``swagger_auto_schema``
+    keyword arguments. Nothing from drf_yasg is imported here; the overrides are only
+    resolved and attached by :func:`apply_documentation` when a schema is generated,
+    so workers with the docs stack disabled never pay for it.
+    """
+
+    def decorator(view: ViewT) -> ViewT:
+        with _deferred_lock:
+            _deferred.append((view, overrides))
+        return view
+
+    return decorator
+
+
+def apply_documentation() -> None:
+    """Attach every pending ``document`` override to its view; safe to call repeatedly."""
+    from drf_yasg.utils import swagger_auto_schema
+
+    with _deferred_lock:
+        while _deferred:
+            view, overrides = _deferred.pop(0)
+            swagger_auto_schema(**import_string(overrides))(view)
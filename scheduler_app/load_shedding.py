@@ -0,0 +1,323 @@
+import heapq
+import itertools
+import math
+import re
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBase, HttpResponseForbidden, JsonResponse
+
+
+class Priority(IntEnum):
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    event: threading.Event = field(compare=False, default_factory=threading.Event)
+    granted: bool = field(compare=False, default=False)
+
+
+class AdaptiveLimiter:
+    """Per-process concurrency limit with a bounded priority queue and AIMD adaptation.
+
+    A request runs if fewer than ``limit * capacity[priority]`` requests are in flight and
+    nothing of equal or higher priority is queued; otherwise it waits in the queue, highest
+    priority first, until a slot frees up or its deadline passes. When the queue is full a
+    new request evicts the lowest-priority waiter if it outranks it, and is shed otherwise.
+
+    The limit follows observed latency: it shrinks multiplicatively (at most once per
+    current latency) while the short-term average latency exceeds ``latency_tolerance``
+    times the baseline (the lowest short-term average seen, allowed to drift upwards), and
+    grows by ``1 / limit`` per completion while requests are using the whole limit.
+    """
+
+    SHORT_TERM_WEIGHT = 0.2
+    BASELINE_DRIFT = 0.001
+    DECREASE_FACTOR = 0.9
+
+    def __init__(
+        self,
+        initial_limit: float = 20,
+        min_limit: float = 2,
+        max_limit: float = 200,
+        max_queue: int = 50,
+        latency_tolerance: float = 2.0,
+        capacity: dict[Priority, float] | None = None,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.max_queue = max_queue
+        self.latency_tolerance = latency_tolerance
+        self.capacity = {priority: 1.0 for priority in Priority} | (capacity or {})
+
+        self.in_flight = 0
+        self.short_latency: float | None = None
+        self.baseline_latency: float | None = None
+        self.admitted = dict.fromkeys(Priority, 0)
+        self.shed = dict.fromkeys(Priority, 0)
+
+        self._lock = threading.Lock()
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+
+    def _fits(self, priority: int) -> bool:
+        return self.in_flight < max(1, math.floor(self.limit * self.capacity[Priority(priority)]))
+
+    def _grant_waiters(self) -> None:
+        while self._queue and self._fits(self._queue[0].priority):
+            waiter = heapq.heappop(self._queue)
+            waiter.granted = True
+            self.in_flight += 1
+            self.admitted[Priority(waiter.priority)] += 1
+            waiter.event.set()
+
+    def acquire(self, priority: Priority, timeout: float) -> bool:
+        """Take a concurrency slot, waiting up to ``timeout`` seconds; False means shed."""
+        with self._lock:
+            if (not self._queue or self._queue[0].priority > priority) and self._fits(priority):
+                self.in_flight += 1
+                self.admitted[priority] += 1
+                return True
+
+            if len(self._queue) >= self.max_queue:
+                lowest = max(self._queue)
+                if lowest.priority <= priority:
+                    self.shed[priority] += 1
+                    return False
+                # Evicted waiters wake up without a grant and are shed
+                self._queue.remove(lowest)
+                heapq.heapify(self._queue)
+                lowest.event.set()
+
+            waiter = _Waiter(priority, next(self._seq))
+            heapq.heappush(self._queue, waiter)
+
+        waiter.event.wait(timeout)
+
+        with self._lock:
+            if waiter.granted:
+                return True
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            self.shed[priority] += 1
+            return False
+
+    def release(self, latency: float) -> None:
+        with self._lock:
+            saturated = self.in_flight >= math.floor(self.limit)
+            self.in_flight -= 1
+            self._adapt(latency, saturated)
+            self._grant_waiters()
+
+    def _adapt(self, latency: float, saturated: bool) -> None:
+        if self.short_latency is None or self.baseline_latency is None:
+            self.short_latency = self.baseline_latency = latency
+            return
+        self.short_latency += self.SHORT_TERM_WEIGHT * (latency - self.short_latency)
+        self.baseline_latency = min(self.short_latency, self.baseline_latency * (1 + self.BASELINE_DRIFT))
+
+        now = time.monotonic()
+        if self.short_latency > self.baseline_latency * self.latency_tolerance:
+            if now - self._last_decrease >= self.short_latency:
+                self.limit = max(self.min_limit, self.limit * self.DECREASE_FACTOR)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": len(self._queue),
+                "latency_seconds": self.short_latency or 0.0,
+                "baseline_latency_seconds": self.baseline_latency or 0.0,
+                "admitted": {priority.name.lower(): count for priority, count in self.admitted.items()},
+                "shed": {priority.name.lower(): count for priority, count in self.shed.items()},
+            }
+
+
+def thread_limits(threads: int, queue_share: float, min_limit: float) -> dict[str, Any]:
+    """Limiter bounds for a worker that runs at most ``threads`` requests at once.
+
+    A gthread worker hands each request to one of its threads, so no more than
+    ``threads`` requests ever reach the middleware and a limit at or above that would
+    never queue. The limit starts at, and is capped, below it: ``queue_share`` of the
+    threads (at least one) are left to wait in the queue.
+    """
+    max_limit = max(1, threads - max(1, math.ceil(threads * queue_share)))
+    min_limit = min(min_limit, max_limit)
+    return {
+        "initial_limit": max_limit,
+        "min_limit": min_limit,
+        "max_limit": max_limit,
+        "max_queue": threads - min_limit,
+    }
+
+
+_limiter: AdaptiveLimiter | None = None
+_limiter_lock = threading.Lock()
+# Request threads of this worker process, when it has a fixed number (gthread workers)
+_worker_threads: int | None = None
+
+
+def get_limiter() -> AdaptiveLimiter:
+    """The process-wide limiter, built from ``settings.LOAD_SHEDDING`` on first use.
+
+    Its limits are sized from the worker's thread count (see :func:`thread_limits`) once
+    :func:`set_worker_threads` was called, and taken from the settings otherwise.
+    """
+    global _limiter  # noqa: PLW0603
+    with _limiter_lock:
+        if _limiter is None:
+            config = settings.LOAD_SHEDDING
+            if _worker_threads is not None:
+                limits = thread_limits(_worker_threads, config["QUEUE_SHARE"], config["MIN_LIMIT"])
+            else:
+                limits = {
+                    "initial_limit": config["INITIAL_LIMIT"],
+                    "min_limit": config["MIN_LIMIT"],
+                    "max_limit": config["MAX_LIMIT"],
+                    "max_queue": config["MAX_QUEUE"],
+                }
+            _limiter = AdaptiveLimiter(
+                **limits,
+                latency_tolerance=config["LATENCY_TOLERANCE"],
+                capacity={Priority[name]: share for name, share in config["CAPACITY"].items()},
+            )
+        return _limiter
+
+
+def set_worker_threads(threads: int | None) -> None:
+    """Size this process's limiter for ``threads`` request threads (None: from the settings)."""
+    global _worker_threads  # noqa: PLW0603
+    _worker_threads = threads
+    reset_limiter()
+
+
+def reset_limiter() -> None:
+    global _limiter  # noqa: PLW0603
+    with _limiter_lock:
+        _limiter = None
+
+
+class LoadSheddingMiddleware:
+    """Admit requests through the process-wide :class:`AdaptiveLimiter`.
+
+    Requests that can't get a slot before their queue deadline get an immediate 503 with
+    ``Retry-After`` instead of piling up behind slow ones. Priorities come from the
+    ``LOAD_SHEDDING["PRIORITIES"]`` rules, so token refreshes and schedule reads keep
+    flowing while signups and bulk writes are shed first.
+
+    A streamed response keeps its slot until the server closes it, as its body is only
+    produced while being sent; its latency is still measured up to the response
+    headers, so slow clients don't shrink the limit.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        config = settings.LOAD_SHEDDING
+        self.enabled = config["ENABLED"]
+        self.max_wait = config["MAX_WAIT"]
+        self.retry_after = config["RETRY_AFTER"]
+        self.exempt = [re.compile(pattern) for pattern in config["EXEMPT_PATHS"]]
+        self.rules = [
+            (re.compile(methods), re.compile(path), Priority[priority])
+            for methods, path, priority in config["PRIORITIES"]
+        ]
+
+    def classify(self, request: HttpRequest) -> Priority:
+        for methods, path, priority in self.rules:
+            if methods.fullmatch(request.method or "") and path.match(request.path_info):
+                return priority
+        return Priority.NORMAL
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        if not self.enabled or any(pattern.match(request.path_info) for pattern in self.exempt):
+            return self.get_response(request)
+
+        limiter = get_limiter()
+        if not limiter.acquire(self.classify(request), self.max_wait):
+            response = JsonResponse({"detail": "Server is overloaded, retry later."}, status=503)
+            response["Retry-After"] = str(self.retry_after)
+            return response
+
+        started = time.monotonic()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            limiter.release(time.monotonic() - started)
+            raise
+        latency = time.monotonic() - started
+        if not response.streaming:
+            limiter.release(latency)
+            return response
+
+        close = response.close
+        released = False
+
+        def close_and_release() -> None:
+            nonlocal released
+            try:
+                close()
+            finally:
+                if not released:
+                    released = True
+                    limiter.release(latency)
+
+        response.close = close_and_release
+        return response
+
+
+def metrics_allowed(request: HttpRequest) -> bool:
+    """Staff sessions, and scrapers presenting ``settings.METRICS_TOKEN`` as a bearer token."""
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("Authorization", "")
+        if secrets.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Load-shedding counters of this worker process in the Prometheus text format."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    stats = get_limiter().stats()
+    lines = [
+        "# HELP scheduler_requests_shed_total Requests rejected with 503 by the load shedder.",
+        "# TYPE scheduler_requests_shed_total counter",
+        *(f'scheduler_requests_shed_total{{priority="{name}"}} {count}' for name, count in stats["shed"].items()),
+        "# HELP scheduler_requests_admitted_total Requests admitted by the load shedder.",
+        "# TYPE scheduler_requests_admitted_total counter",
+        *(
+            f'scheduler_requests_admitted_total{{priority="{name}"}} {count}'
+            for name, count in stats["admitted"].items()
+        ),
+        "# TYPE scheduler_concurrency_limit gauge",
+        f"scheduler_concurrency_limit {stats['limit']:.3f}",
+        "# TYPE scheduler_requests_in_flight gauge",
+        f"scheduler_requests_in_flight {stats['in_flight']}",
+        "# TYPE scheduler_requests_queued gauge",
+        f"scheduler_requests_queued {stats['queued']}",
+        "# TYPE scheduler_request_latency_seconds gauge",
+        f"scheduler_request_latency_seconds {stats['latency_seconds']:.6f}",
+        "# TYPE scheduler_baseline_latency_seconds gauge",
+        f"scheduler_baseline_latency_seconds {stats['baseline_latency_seconds']:.6f}",
+    ]
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseNotModified
+from django.urls import get_resolver
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from .docs import apply_documentation
+
+API_INFO = openapi.Info(
+    title="Your API",
+    default_version="v1",
+    description="Your API description",
+    terms_of_service="https://www.yourapp.com/terms/",
+    contact=openapi.Contact(email="contact@yourapp.com"),
+    license=openapi.License(name="Your License"),
+)
+
+
+class SchemaGenerator(OpenAPISchemaGenerator):
+    def get_schema(self, request=None, public=False):
+        # Views register their scheduler_app.docs.document overrides when imported, so load
+        # the URLconf first; in a fresh process nothing may have imported it yet.
+        _ = get_resolver().url_patterns
+        apply_documentation()
+        return super().get_schema(request, public)
+
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    generator_class=SchemaGenerator,
+    permission_classes=(permissions.AllowAny,),
+)
+
+SCHEMA_FORMATS = {
+    "json": ("application/json", OpenAPICodecJson),
+    "yaml": ("application/yaml", OpenAPICodecYaml),
+}
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    content: bytes
+    gzipped: bytes
+    content_type: str
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+    @classmethod
+    def from_content(cls, content: bytes, content_type: str, gzipped: bytes | None = None) -> "SchemaDocument":
+        if gzipped is None:
+            gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+        etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+        return cls(content=content, gzipped=gzipped, content_type=content_type, etag=etag)
+
+
+_documents: dict[str, SchemaDocument] = {}
+_documents_lock = threading.Lock()
+
+
+def generate_schema() -> openapi.Swagger:
+    # Generated without a request so the document is host-independent and can be shared
+    # between all clients; Swagger UI falls back to the serving host.
+    generator = SchemaGenerator(API_INFO)
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(fmt: str, schema: openapi.Swagger | None = None) -> bytes:
+    _, codec_class = SCHEMA_FORMATS[fmt]
+    return codec_class(validators=[]).encode(schema if schema is not None else generate_schema())
+
+
+def schema_path(fmt: str, directory: Path | None = None) -> Path:
+    return Path(directory or settings.OPENAPI_SCHEMA_DIR) / f"schema.{fmt}"
+
+
+def write_schema_files(directory: Path | None = None) -> list[Path]:
+    """Render every format once and write it, together with a gzipped copy, to ``directory``."""
+    schema = generate_schema()
+    written = []
+    for fmt, (content_type, _) in SCHEMA_FORMATS.items():
+        document = SchemaDocument.from_content(render_schema(fmt, schema), content_type)
+        path = schema_path(fmt, directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(document.content)
+        gzip_path = path.with_name(path.name + ".gz")
+        gzip_path.write_bytes(document.gzipped)
+        written += [path, gzip_path]
+    return written
+
+
+def _load_document(fmt: str) -> SchemaDocument:
+    content_type, _ = SCHEMA_FORMATS[fmt]
+    path = schema_path(fmt)
+    if path.is_file():
+        gzip_path = path.with_name(path.name + ".gz")
+        gzipped = gzip_path.read_bytes() if gzip_path.is_file() else None
+        return SchemaDocument.from_content(path.read_bytes(), content_type, gzipped)
+    return SchemaDocument.from_content(render_schema(fmt), content_type)
+
+
+def get_schema_document(fmt: str) -> SchemaDocument:
+    """Return the schema for ``fmt``, loading the pre-generated file or generating it on first use."""
+    document = _documents.get(fmt)
+    if document is None:
+        with _documents_lock:
+            document = _documents.get(fmt)
+            if document is None:
+                document = _documents[fmt] = _load_document(fmt)
+    return document
+
+
+def clear_schema_cache() -> None:
+    with _documents_lock:
+        _documents.clear()
+
+
+@require_safe
+def schema_document_view(request: HttpRequest, format: str) -> HttpResponse:  # noqa: A002
+    fmt = format.lstrip(".")
+    if fmt not in SCHEMA_FORMATS:
+        raise Http404
+    document = get_schema_document(fmt)
+
+    use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    etag = document.gzip_etag if use_gzip else document.etag
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        response: HttpResponse = HttpResponseNotModified()
+    else:
+        response = HttpResponse(document.gzipped if use_gzip else document.content, content_type=document.content_type)
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
@@ -0,0 +1,38 @@
+from functools import cached_property
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+
+# Below this many rows an exact COUNT(*) is cheap and used even where an estimate is available
+EXACT_COUNT_BELOW = 10_000
+
+
+def estimated_row_count(model: type[Model], using: str = "default") -> int | None:
+    """The planner's row estimate for a model's table (Postgres), or None if unavailable."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for admin changelists over big tables.
+
+    An unfiltered list is counted from the table statistics instead of a full
+    ``COUNT(*)`` scan; filtered lists (searches, list filters) are counted exactly, as
+    they go through an index. The last page number may therefore be approximate.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        objects = self.object_list
+        if isinstance(objects, QuerySet) and not objects.query.where:
+            estimate = estimated_row_count(objects.model, objects.db)
+            if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+                return estimate
+        return super().count
@@ -0,0 +1,135 @@
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Any
+
+from django.db import connections
+from django.urls import get_resolver
+from django.utils.module_loading import import_string
+from gunicorn.app.base import BaseApplication
+
+from . import load_shedding, warmup
+
+WSGI_APPLICATION = "scheduler_app.wsgi.application"
+
+
+def available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))  # respects CPU pinning/cgroup cpusets
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """Gunicorn's recommended ``2 * CPUs + 1``, honouring WEB_CONCURRENCY when set."""
+    if concurrency := os.environ.get("WEB_CONCURRENCY"):
+        return max(int(concurrency), 1)
+    return available_cpus() * 2 + 1
+
+
+class Server(BaseApplication):
+    """Pre-forking gunicorn server running the project's WSGI application.
+
+    The application is loaded once in the master (``preload_app``) so workers fork
+    with Django set up, the URLconf resolved and the fork-safe caches warm, and each
+    worker is recycled after ``max_requests`` (plus jitter) to bound memory growth.
+    Workers finish warming up (see ``scheduler_app.warmup``) before accepting requests.
+    """
+
+    def __init__(self, application: str, options: dict[str, Any]):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        application = import_string(self.application)
+        # Import every view now rather than on each worker's first request
+        _ = get_resolver().url_patterns
+        warmup.warm_up_shared()
+        # Don't let forked workers inherit (and share) the master's database sockets
+        connections.close_all()
+        return application
+
+
+def warm_worker(arbiter: Any, worker: Any) -> None:
+    # gunicorn's post_fork hook: runs in the new worker before it starts accepting
+    threaded = worker.cfg.threads > 1
+    if threaded:
+        load_shedding.set_worker_threads(worker.cfg.threads)
+    warmup.warm_up_worker(serving_thread=not threaded)
+    if threaded:
+        # gthread workers serve from other threads, which never use this one's connections
+        connections.close_all()
+
+
+def server_options(
+    bind: str,
+    workers: int | None = None,
+    threads: int = 1,
+    max_requests: int = 1000,
+    max_requests_jitter: int = 100,
+    timeout: int = 30,
+    graceful_timeout: int = 30,
+    pidfile: Path | None = None,
+) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "bind": bind,
+        "workers": workers or default_workers(),
+        "threads": threads,
+        "preload_app": True,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "pidfile": str(pidfile) if pidfile else None,
+        "post_fork": warm_worker,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+    if threads > 1:
+        options["worker_class"] = "gthread"
+    return options
+
+
+def read_pid(pidfile: Path) -> int | None:
+    try:
+        return int(pidfile.read_text().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def graceful_reload(pidfile: Path, timeout: float = 60) -> int:
+    """Replace a running server with one running the code currently on disk.
+
+    ``SIGUSR2`` makes the old master exec a new master (which re-imports the code, as
+    preloaded apps can't pick it up with ``SIGHUP``) while it keeps serving. The new
+    master writes its pid to ``<pidfile>.2`` once the application has loaded, at which
+    point the old one is shut down gracefully with ``SIGTERM`` and the new master takes
+    over ``pidfile``. Both masters share the listening socket, so no connection is
+    refused in between. Returns the new master's pid.
+
+    The new master is a child of the old one, so this only works where the old
+    master's exit doesn't end the service: under systemd or a process supervisor, not
+    as a container's main process (PID 1 or the direct child of an init such as tini),
+    where the container stops with it. Containers are reloaded by rolling them instead.
+    """
+    old_pid = read_pid(pidfile)
+    if old_pid is None:
+        raise RuntimeError(f"No running server found in {pidfile}")
+
+    new_pidfile = pidfile.with_name(pidfile.name + ".2")
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        new_pid = read_pid(new_pidfile)
+        if new_pid is not None:
+            os.kill(old_pid, signal.SIGTERM)
+            return new_pid
+        time.sleep(0.2)
+    raise RuntimeError(f"New server did not start within {timeout:.0f}s; {old_pid} is still serving")
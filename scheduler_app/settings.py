@@ -6,6 +6,8 @@ from typing import Any
 
 import dj_database_url
 
+from scheduler_app.database import configure_database, env_flag
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -72,6 +74,10 @@ if ENVIRONMENT == EnvironmentOption.PRODUCTION:
 
 ALLOWED_HOSTS: list[Any] = ["*"]
 
+# The drf_yasg documentation stack (swagger/redoc views and schema generation) is only
+# imported when enabled, which keeps it off the cold-start path of production workers.
+API_DOCS_ENABLED = env_flag("API_DOCS_ENABLED", ENVIRONMENT < EnvironmentOption.PRODUCTION)
+
 
 # Application definition
 
@@ -82,7 +88,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "drf_yasg",
+    *(["drf_yasg"] if API_DOCS_ENABLED else []),
     "rest_framework",
     "rest_framework_simplejwt",
     "scheduler",
@@ -134,22 +140,133 @@ SWAGGER_SETTINGS = {
     "USE_SESSION_AUTH": False,
     "SECURITY_REQUIREMENTS": [{"Bearer": []}],
     "SCHEMES": ["https", "http"],
+    "DEFAULT_GENERATOR_CLASS": "scheduler_app.openapi.SchemaGenerator",
+    # The UIs load the pre-generated document instead of regenerating it per page view.
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+
+REDOC_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
 }
 
+# Pre-generated OpenAPI documents (``manage.py generate_openapi``). When missing, the
+# schema is generated once per process on first request and kept in memory.
+OPENAPI_SCHEMA_DIR = Path(os.environ.get("OPENAPI_SCHEMA_DIR", BASE_DIR / "openapi"))
+OPENAPI_SCHEMA_MAX_AGE = int(os.environ.get("OPENAPI_SCHEMA_MAX_AGE", "300"))
+
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_THROTTLE_CLASSES": (
+        "scheduler_app.throttling.UserTokenBucketThrottle",
+        "scheduler_app.throttling.IPTokenBucketThrottle",
+    ),
+    # "<user|ip>:<throttle_scope>[.<action>]": rate; the most specific match applies
+    "DEFAULT_THROTTLE_RATES": {
+        "user:schedules": "600/min",
+        "user:schedules.list": "120/min",
+        "user:schedules.all_occurrences": "30/min",
+        "user:schedules.bulk_import": "10/min",
+        "user:batch": "60/min",
+        "user:auth.account": "5/hour",
+        "ip:auth.login": "30/min",
+        "ip:auth.refresh": "120/min",
+        "ip:auth.signup": "10/hour",
+    },
+    # Trusted reverse proxies in front of the app; with 0, X-Forwarded-For is ignored and
+    # clients are throttled by REMOTE_ADDR, as the header can be set by anyone
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", "0")),
 }
 
+# Throttle buckets are kept in each process by default; name a CACHES alias to share them
+THROTTLE_CACHE = os.environ.get("THROTTLE_CACHE") or None
+
+# Share one in-flight query/render between concurrent identical schedule reads
+SCHEDULE_READ_COALESCING = env_flag("SCHEDULE_READ_COALESCING", True)
+
+# Rendered schedule reads each process keeps (with coalescing on); 0 disables the cache
+SCHEDULE_READ_CACHE_SIZE = int(os.environ.get("SCHEDULE_READ_CACHE_SIZE", "5000"))
+
+# Seconds between two recordings of a user's schedule reads by one process; the warm-up
+# preloads the schedules of the latest readers
+SCHEDULE_READ_RECORD_INTERVAL = float(os.environ.get("SCHEDULE_READ_RECORD_INTERVAL", "300"))
+
+# Most sub-requests accepted by POST /api_v1/batch/
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "50"))
+
+# Largest sub-response body buffered into a batch response; bigger ones are reported as 413
+BATCH_MAX_RESPONSE_BYTES = int(os.environ.get("BATCH_MAX_RESPONSE_BYTES", str(1024 * 1024)))
+
+# Longest date range the occurrence endpoints expand in one request
+OCCURRENCES_MAX_DAYS = int(os.environ.get("OCCURRENCES_MAX_DAYS", "731"))
+
+# Most schedules accepted by one POST /api_v1/scheduler/schedules/bulk_import/
+BULK_IMPORT_MAX_SCHEDULES = int(os.environ.get("BULK_IMPORT_MAX_SCHEDULES", "10000"))
+
+# Background jobs (scheduler.jobs), run by `python manage.py run_workers`
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+# Seconds before a failed job is retried, doubling with each further attempt
+JOB_RETRY_DELAY = float(os.environ.get("JOB_RETRY_DELAY", "30"))
+# Running jobs that report no progress for this many seconds are assumed lost and requeued
+JOB_LOCK_TIMEOUT = float(os.environ.get("JOB_LOCK_TIMEOUT", "600"))
+# Seconds an idle worker waits before polling the queue again
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Cache warming before a worker serves requests (scheduler_app.warmup)
+WARMUP = {
+    "ENABLED": env_flag("WARMUP_ENABLED", True),
+    # Seconds each process may spend warming up; tasks that don't fit are skipped
+    "BUDGET": float(os.environ.get("WARMUP_BUDGET", "5")),
+    # Run in this order; see scheduler_app.warmup.TASKS
+    "TASKS": ["schema", "jwt", "validators", "database", "schedules"],
+    # Latest schedule readers whose reads each worker preloads into its read cache
+    "HOT_USERS": int(os.environ.get("WARMUP_HOT_USERS", "100")),
+}
+
+
+# Per-process admission control (scheduler_app.load_shedding). Only has an effect when a
+# process serves requests concurrently: gthread workers (serve --threads) or the threaded
+# runserver.
+LOAD_SHEDDING = {
+    "ENABLED": env_flag("LOAD_SHEDDING_ENABLED", True),
+    # Limits of the threaded runserver; gthread workers derive theirs from their thread count
+    "INITIAL_LIMIT": int(os.environ.get("LOAD_SHEDDING_INITIAL_LIMIT", "20")),
+    "MIN_LIMIT": int(os.environ.get("LOAD_SHEDDING_MIN_LIMIT", "2")),
+    "MAX_LIMIT": int(os.environ.get("LOAD_SHEDDING_MAX_LIMIT", "200")),
+    "MAX_QUEUE": int(os.environ.get("LOAD_SHEDDING_MAX_QUEUE", "50")),
+    # Share of a gthread worker's threads kept above its limit, to wait in the queue
+    "QUEUE_SHARE": float(os.environ.get("LOAD_SHEDDING_QUEUE_SHARE", "0.25")),
+    # Seconds a request may wait in the queue before it is shed
+    "MAX_WAIT": float(os.environ.get("LOAD_SHEDDING_MAX_WAIT", "0.5")),
+    "RETRY_AFTER": 1,
+    # Shrink the limit while latency is this many times the baseline
+    "LATENCY_TOLERANCE": 2.0,
+    # Share of the limit each priority may use, so low priority work is shed first
+    "CAPACITY": {"CRITICAL": 1.0, "HIGH": 1.0, "NORMAL": 0.9, "LOW": 0.5},
+    # (method regex, path regex, priority); first match wins, NORMAL otherwise
+    "PRIORITIES": [
+        ("POST", r"^/api_v1/auth/refresh_token/", "CRITICAL"),
+        ("POST", r"^/api_v1/auth/login/", "HIGH"),
+        ("GET|HEAD", r"^/api_v1/scheduler/", "HIGH"),
+        ("POST", r"^/api_v1/auth/signup/", "LOW"),
+        ("POST", r"^/api_v1/batch/", "LOW"),
+        ("POST", r"^/api_v1/scheduler/schedules/bulk_import/", "LOW"),
+    ],
+    "EXEMPT_PATHS": [r"^/metrics/$", r"^/ready/$"],
+}
+
+# Bearer token for scraping /metrics/; without one only staff sessions can read it
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "scheduler_app.load_shedding.LoadSheddingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -183,7 +300,31 @@ WSGI_APPLICATION = "scheduler_app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {"default": dj_database_url.config(default=DATABASE_URL)}
+# Connections are kept open between requests (CONN_MAX_AGE seconds, 0 to close after
+# every request) and pinged before reuse. On Postgres with psycopg 3 installed, the
+# psycopg_pool integration takes over instead. SQLite gets WAL and related pragmas.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DB_CONN_HEALTH_CHECKS = env_flag("DB_CONN_HEALTH_CHECKS", True)
+DB_POOL = env_flag("DB_POOL", True)
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+SQLITE_TUNED = env_flag("SQLITE_TUNED", True)
+
+DATABASES = {
+    "default": configure_database(
+        dj_database_url.config(
+            default=DATABASE_URL,
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        ),
+        pool=DB_POOL,
+        pool_min_size=DB_POOL_MIN_SIZE,
+        pool_max_size=DB_POOL_MAX_SIZE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        sqlite_tuned=SQLITE_TUNED,
+    )
+}
 
 
 # Password validation
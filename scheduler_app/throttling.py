@@ -0,0 +1,148 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Most local buckets kept; the least recently used one is dropped to make room for a new one
+MAX_LOCAL_BUCKETS = 10_000
+
+# (scope, ident) -> (tokens, updated_at, full_at), least recently used first
+_buckets: OrderedDict[tuple[str, str], tuple[float, float, float]] = OrderedDict()
+_buckets_lock = threading.Lock()
+
+
+@lru_cache(maxsize=64)
+def parse_rate(rate: str) -> tuple[float, float]:
+    """Parse a DRF style rate ("100/min") into (bucket capacity, tokens refilled per second)."""
+    num, period = rate.split("/")
+    capacity = float(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def reset_buckets() -> None:
+    with _buckets_lock:
+        _buckets.clear()
+
+
+def _spend(
+    state: tuple[float, float, float] | None, capacity: float, refill: float, now: float
+) -> tuple[float, tuple[float, float, float]]:
+    """Refill a bucket up to ``now`` and take a token; returns (wait, new state)."""
+    tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * refill)
+    wait = 0.0
+    if tokens >= 1:
+        tokens -= 1
+    else:
+        wait = (1 - tokens) / refill
+    return wait, (tokens, now, now + (capacity - tokens) / refill)
+
+
+def take_token(scope: str, ident: str, rate: str, now: float | None = None) -> float:
+    """Take one token from the bucket of ``(scope, ident)``.
+
+    Returns 0 when the request is allowed, otherwise the seconds until a token is
+    available. Buckets live in this process unless ``THROTTLE_CACHE`` names a cache,
+    in which case they are shared through it (one get and one set per check).
+
+    At most ``MAX_LOCAL_BUCKETS`` local buckets are kept, evicting the least recently
+    used; an evicted client starts over with a full bucket, which only happens once
+    that many clients have been seen since its last request.
+    """
+    if now is None:
+        # Shared buckets need a clock that agrees between processes
+        now = time.time() if settings.THROTTLE_CACHE else time.monotonic()
+    capacity, refill = parse_rate(rate)
+
+    if settings.THROTTLE_CACHE:
+        cache = caches[settings.THROTTLE_CACHE]
+        cache_key = f"throttle:{scope}:{ident}"
+        wait, state = _spend(cache.get(cache_key), capacity, refill, now)
+        cache.set(cache_key, state, timeout=max(1, int(state[2] - now) + 1))
+        return wait
+
+    key = (scope, ident)
+    with _buckets_lock:
+        wait, _buckets[key] = _spend(_buckets.get(key), capacity, refill, now)
+        _buckets.move_to_end(key)
+        if len(_buckets) > MAX_LOCAL_BUCKETS:
+            _buckets.popitem(last=False)
+    return wait
+
+
+class TokenBucketThrottle(BaseThrottle, ABC):
+    """Token bucket throttle scoped by view and action.
+
+    Rates are looked up in ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]`` as
+    ``"<kind>:<throttle_scope>.<action>"`` first and ``"<kind>:<throttle_scope>"`` second,
+    so a ViewSet can give its actions different limits. Views without a matching rate
+    are not throttled. The bucket holds as many tokens as the rate's request count and
+    refills continuously, allowing bursts up to the full rate.
+    """
+
+    kind = ""
+
+    def __init__(self) -> None:
+        self._wait = 0.0
+
+    @abstractmethod
+    def get_ident_for(self, request: Any) -> str | None:
+        """The bucket owner for ``request``, or None to leave it unthrottled."""
+
+    def get_scope_and_rate(self, view: Any) -> tuple[str, str] | None:
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return None
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        action = getattr(view, "action", None)
+        for candidate in (f"{scope}.{action}" if action else None, scope):
+            if candidate and (rate := rates.get(f"{self.kind}:{candidate}")):
+                return candidate, rate
+        return None
+
+    def allow_request(self, request: Any, view: Any) -> bool:
+        scope_and_rate = self.get_scope_and_rate(view)
+        if scope_and_rate is None:
+            return True
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return True
+        scope, rate = scope_and_rate
+        self._wait = take_token(f"{self.kind}:{scope}", ident, rate)
+        return self._wait == 0
+
+    def wait(self) -> float | None:
+        return self._wait or None
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Buckets per authenticated user; anonymous requests are left to the IP throttle."""
+
+    kind = "user"
+
+    def get_ident_for(self, request: Any) -> str | None:
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Buckets per client address.
+
+    ``REMOTE_ADDR`` is used unless ``REST_FRAMEWORK["NUM_PROXIES"]`` (the number of
+    trusted proxies in front of the app) is set, in which case the client address is
+    taken from that position of X-Forwarded-For.
+    """
+
+    kind = "ip"
+
+    def get_ident_for(self, request: Any) -> str | None:
+        return self.get_ident(request)
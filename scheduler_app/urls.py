@@ -1,31 +1,26 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Your API",
-        default_version="v1",
-        description="Your API description",
-        terms_of_service="https://www.yourapp.com/terms/",
-        contact=openapi.Contact(email="contact@yourapp.com"),
-        license=openapi.License(name="Your License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
 
+from .load_shedding import metrics_view
+from .warmup import readiness_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api_v1/", include("api_v1.urls")),
-    path("swagger<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("ready/", readiness_view, name="ready"),
 ]
+
+if settings.API_DOCS_ENABLED:
+    from .openapi import schema_document_view, schema_view
+
+    urlpatterns += [
+        path("swagger<format>/", schema_document_view, name="schema-json"),
+        path(
+            "swagger/",
+            schema_view.with_ui("swagger", cache_timeout=0),
+            name="schema-swagger-ui",
+        ),
+        path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    ]
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.db import connection
+from django.http import HttpRequest, JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from scheduler.models import recent_readers
+from scheduler.serializers import OccurrenceQuerySerializer, ScheduleSerializer
+from scheduler.views import ScheduleViewSet
+
+from .throttling import parse_rate
+
+logger = logging.getLogger(__name__)
+
+
+def warm_schema(deadline: float) -> None:
+    if settings.API_DOCS_ENABLED:
+        from .openapi import SCHEMA_FORMATS, get_schema_document
+
+        for fmt in SCHEMA_FORMATS:
+            get_schema_document(fmt)
+
+
+def warm_jwt(deadline: float) -> None:
+    # Signing and verifying once imports the JWT backend and prepares its keys
+    AccessToken(str(AccessToken()))
+
+
+def warm_validators(deadline: float) -> None:
+    # CommonPasswordValidator reads its 20k-entry password list when constructed
+    password_validation.get_default_password_validators()
+    _ = ScheduleSerializer().fields
+    _ = OccurrenceQuerySerializer().fields
+    for rate in api_settings.DEFAULT_THROTTLE_RATES.values():
+        parse_rate(rate)
+
+
+def warm_database(deadline: float) -> None:
+    pool = getattr(connection, "pool", None)  # psycopg's, with DATABASES OPTIONS["pool"]
+    if pool is not None:
+        # Every thread of the process takes its connections from this pool
+        pool.open(wait=True, timeout=max(deadline - time.monotonic(), 0.001))
+    elif state.serving_thread:
+        # Other connections are per thread, so only the thread serving requests gains from one
+        connection.ensure_connection()
+
+
+def warm_schedules(deadline: float) -> None:
+    """Preload the schedule reads of the latest readers into this process's read cache."""
+    if settings.SCHEDULE_READ_COALESCING and settings.SCHEDULE_READ_CACHE_SIZE:
+        ScheduleViewSet.preload_reads(recent_readers(settings.WARMUP["HOT_USERS"]), deadline)
+
+
+TASKS: dict[str, Callable[[float], None]] = {
+    "schema": warm_schema,
+    "jwt": warm_jwt,
+    "validators": warm_validators,
+    "database": warm_database,
+    "schedules": warm_schedules,
+}
+
+# Tasks whose results outlive a fork, so a preloading master can run them once for all workers
+SHARED_TASKS = frozenset({"schema", "jwt", "validators"})
+
+
+class WarmupState:
+    """Warm-up progress of this process: "cold", then "warming", then "ready"."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.status = "cold"
+        self.tasks: dict[str, dict[str, Any]] = {}
+        # Whether the thread warming up goes on to serve requests (sync workers)
+        self.serving_thread = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {"status": self.status, "tasks": {name: dict(result) for name, result in self.tasks.items()}}
+
+
+state = WarmupState()
+
+
+def warm_up(tasks: Iterable[str] | None = None, budget: float | None = None, finish: bool = True) -> dict[str, Any]:
+    """Run warm-up tasks in order within ``budget`` seconds; tasks that don't fit are skipped.
+
+    Defaults to the configured ``WARMUP["TASKS"]`` and ``WARMUP["BUDGET"]``. A failing
+    task is logged and doesn't stop the others: warming is an optimisation, so the
+    process becomes ready either way once ``finish`` is set.
+    """
+    config = settings.WARMUP
+    names = list(config["TASKS"] if tasks is None else tasks)
+    deadline = time.monotonic() + (config["BUDGET"] if budget is None else budget)
+    with state.lock:
+        state.status = "warming"
+
+    for name in names:
+        started = time.monotonic()
+        if started >= deadline:
+            result: dict[str, Any] = {"status": "skipped"}
+        else:
+            try:
+                TASKS[name](deadline)
+                result = {"status": "done"}
+            except Exception as exc:
+                logger.exception("Warm-up task %s failed", name)
+                result = {"status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+        result["seconds"] = round(time.monotonic() - started, 4)
+        with state.lock:
+            state.tasks[name] = result
+
+    with state.lock:
+        state.status = "ready" if finish else "cold"
+    return state.snapshot()
+
+
+def warm_up_shared() -> None:
+    """Run the fork-safe tasks, e.g. in a preloading master before it forks its workers."""
+    if settings.WARMUP["ENABLED"]:
+        warm_up([name for name in settings.WARMUP["TASKS"] if name in SHARED_TASKS], finish=False)
+
+
+def warm_up_worker(serving_thread: bool = False) -> None:
+    """Run the tasks the master didn't complete in a freshly forked worker and mark it ready.
+
+    Tasks the master skipped for lack of time or that failed there are tried again.
+    ``serving_thread`` tells whether the calling thread goes on to serve requests.
+    """
+    with state.lock:
+        state.serving_thread = serving_thread
+    if settings.WARMUP["ENABLED"]:
+        with state.lock:
+            done = {name for name, result in state.tasks.items() if result["status"] == "done"}
+        warm_up([name for name in settings.WARMUP["TASKS"] if name not in done])
+    with state.lock:
+        state.status = "ready"
+
+
+def _warm_up_in_background() -> None:
+    with state.lock:
+        if state.status != "cold":
+            return
+        state.status = "warming"
+
+    def run() -> None:
+        try:
+            warm_up_worker()
+        finally:
+            connection.close()  # this thread's connection
+
+    threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def readiness_view(request: HttpRequest) -> JsonResponse:
+    """200 once this worker has warmed up, 503 (with per-task progress) until then.
+
+    Workers started by ``manage.py serve`` warm up before accepting requests; under other
+    servers the first probe starts the warm-up in the background.
+    """
+    if not settings.WARMUP["ENABLED"]:
+        return JsonResponse({"status": "ready", "tasks": {}})
+    _warm_up_in_background()
+    snapshot = state.snapshot()
+    return JsonResponse(snapshot, status=200 if snapshot["status"] == "ready" else 503)